@@ -5,6 +5,34 @@ from .base import (
     FormValidationError,
     GovQA,
     IncorrectCaptcha,
+    MissingPostbackState,
     UnauthenticatedError,
     UnsupportedSite,
 )
+from .transport import Transport
+
+# everything else is imported on first use, so that `import govqa` stays
+# fast for clients that only read requests
+_LAZY_EXPORTS = {
+    "AccountPool": "accounts",
+    "AttachmentStore": "attachments",
+    "Cassette": "cassette",
+    "ParseCache": "cache",
+    "ProbeStore": "probe",
+    "SearchIndex": "search",
+    "UnrecordedRequest": "cassette",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+
+        module = importlib.import_module(f".{_LAZY_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_EXPORTS])
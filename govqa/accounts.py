@@ -0,0 +1,119 @@
+import concurrent.futures
+
+
+class AccountPool:
+    """
+    Many accounts on one GovQA instance, used concurrently.
+
+    Each account gets its own client, forked from ``client`` with
+    :meth:`govqa.GovQA.fork`, so it has its own cookies but shares the
+    connection pool and throttle. To keep workers from waiting on
+    connections, ``max_workers`` should not be more than the client's
+    :class:`govqa.Transport` ``pool_maxsize``.
+
+    :param client: Client for the GovQA instance
+    :type client: govqa.GovQA
+    :param max_workers: Number of accounts to work on at the same time
+    :type max_workers: int
+    """
+
+    def __init__(self, client, max_workers=8):
+        self.client = client
+        self.max_workers = max_workers
+        self.clients = {}
+
+    def login(self, credentials):
+        """
+        Log into many accounts at once. Accounts that log in successfully are
+        added to ``clients``.
+
+        :param credentials: Dictionary of passwords, keyed by user name
+        :type credentials: dict
+        :return: Dictionary of the errors raised for accounts that could not
+                 log in, keyed by user name
+        :rtype: dict
+        """
+
+        def login(username, password):
+            client = self.client.fork()
+            client.login(username, password)
+            return client
+
+        clients, errors = self._split(self._map(login, credentials.items()))
+        self.clients.update(clients)
+
+        return errors
+
+    def list_requests(self):
+        """
+        Retrieve the requests of every logged in account at once. An error
+        for one account doesn't keep the others' requests from being
+        returned.
+
+        :return: Dictionary of lists like those returned by
+                 :meth:`govqa.GovQA.list_requests`, keyed by user name, and
+                 a dictionary of the errors raised for accounts whose
+                 requests could not be retrieved, keyed by user name
+        :rtype: tuple
+        """
+        results = self._map(
+            lambda username, client: client.list_requests(), self.clients.items()
+        )
+        return self._split(results)
+
+    def get_requests(self, request_ids):
+        """
+        Retrieve many requests, across accounts, at once.
+
+        :param request_ids: Dictionary of lists of request identifiers, keyed
+                            by the user name of the account they belong to
+        :type request_ids: dict
+        :return: Dictionary, keyed by user name, of dictionaries of requests
+                 like those returned by :meth:`govqa.GovQA.get_request`,
+                 keyed by request identifier, and a dictionary, shaped the
+                 same way, of the errors raised for requests that could not
+                 be retrieved
+        :rtype: tuple
+        """
+        jobs = [
+            ((username, request_id), self.clients[username])
+            for username, ids in request_ids.items()
+            for request_id in ids
+        ]
+        results, errors = self._split(
+            self._map(lambda key, client: client.get_request(key[1]), jobs)
+        )
+
+        requests = {username: {} for username in request_ids}
+        for (username, request_id), request in results.items():
+            requests[username][request_id] = request
+
+        request_errors = {}
+        for (username, request_id), error in errors.items():
+            request_errors.setdefault(username, {})[request_id] = error
+
+        return requests, request_errors
+
+    def _map(self, func, jobs):
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+            futures = {executor.submit(func, key, arg): key for key, arg in jobs}
+
+            results = {}
+            for future in concurrent.futures.as_completed(futures):
+                key = futures[future]
+                try:
+                    results[key] = (future.result(), None)
+                except Exception as error:
+                    results[key] = (None, error)
+
+        return results
+
+    def _split(self, results):
+        successes = {}
+        errors = {}
+        for key, (result, error) in results.items():
+            if error is None:
+                successes[key] = result
+            else:
+                errors[key] = error
+        return successes, errors
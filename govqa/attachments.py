@@ -0,0 +1,272 @@
+import email.message
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import unquote, urlparse
+
+
+def attachment_filename(attachment):
+    """
+    :param attachment: an attachment dictionary returned by
+                       :meth:`govqa.GovQA.get_request`
+    :type attachment: dict
+    :return: the attachment's filename
+    :rtype: str
+    """
+    # let the email package handle quoting and RFC 2231 encoded names
+    message = email.message.Message()
+    message["Content-Disposition"] = attachment.get("content-disposition") or ""
+    filename = message.get_filename()
+    if filename:
+        return filename.strip()
+
+    return os.path.basename(unquote(urlparse(attachment["url"]).path))
+
+
+class AttachmentStore:
+    """
+    Local, content-addressed store of attachment files.
+
+    Each distinct file is kept once, named by its SHA-256 digest, and linked
+    to every request it was attached to. An attachment that is already
+    linked, with the same upload date, is not downloaded again, and one whose
+    size and ETag match a stored file is linked without reading its body.
+
+    :param root: Directory to keep files and their index in
+    :type root: str
+    :param max_bytes: Total size to keep the store under. When it is
+                      exceeded, the least recently used files are evicted.
+    :type max_bytes: int
+    """
+
+    def __init__(self, root, max_bytes=None):
+        self.root = root
+        self.max_bytes = max_bytes
+
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(root, "index.sqlite"), check_same_thread=False
+        )
+        with self._db:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS objects (
+                    digest TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS objects_etag ON objects (etag, size);
+                CREATE TABLE IF NOT EXISTS links (
+                    request_id TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    digest TEXT NOT NULL REFERENCES objects (digest),
+                    uploaded_at TEXT,
+                    PRIMARY KEY (request_id, filename)
+                );
+                CREATE INDEX IF NOT EXISTS links_digest ON links (digest);
+                """)
+
+    def path(self, digest):
+        """
+        :return: location of the stored file with the given digest
+        :rtype: str
+        """
+        return os.path.join(self.root, "objects", digest[:2], digest[2:])
+
+    def get(self, request_id, filename, uploaded_at=None):
+        """
+        :param uploaded_at: the attachment's upload date. If given, a file
+                            linked for a different upload, e.g., one the
+                            attachment has since replaced, isn't returned.
+        :type uploaded_at: datetime.date
+        :return: location of the file attached to a request under the given
+                 filename, or None if it isn't stored
+        :rtype: str
+        """
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT digest, uploaded_at FROM links "
+                "WHERE request_id = ? AND filename = ?",
+                (str(request_id), filename),
+            ).fetchone()
+
+            if row is None:
+                return None
+            elif uploaded_at is not None and row[1] != uploaded_at.isoformat():
+                return None
+
+            self._touch(row[0])
+
+        return self.path(row[0])
+
+    def fetch(self, session, request_id, attachment):
+        """
+        Store an attachment, downloading it only if it isn't already stored.
+
+        :param session: client to download the attachment with
+        :type session: govqa.GovQA
+        :param request_id: Identifier of the request the attachment belongs to
+        :type request_id: int
+        :param attachment: an attachment dictionary returned by
+                           :meth:`govqa.GovQA.get_request`
+        :type attachment: dict
+        :return: location of the stored file
+        :rtype: str
+        """
+        filename = attachment_filename(attachment)
+        uploaded_at = attachment.get("uploaded_at")
+
+        # a file replaced under the same name has a new upload date, so
+        # without one, there's no telling whether the linked file is current
+        if uploaded_at is not None:
+            path = self.get(request_id, filename, uploaded_at)
+            if path is not None:
+                return path
+
+        with session.get(attachment["url"], stream=True) as response:
+            etag = response.headers.get("ETag")
+            size = response.headers.get("Content-Length")
+
+            if etag and size:
+                digest = self._find(etag, int(size))
+                if digest is not None:
+                    self.link(request_id, filename, digest, uploaded_at)
+                    return self.path(digest)
+
+            digest = self.add(response.iter_content(chunk_size=64 * 1024), etag)
+
+        self.link(request_id, filename, digest, uploaded_at)
+        return self.path(digest)
+
+    def add(self, chunks, etag=None):
+        """
+        Store a file's contents.
+
+        :param chunks: the file's contents, as an iterable of bytes
+        :type chunks: iterable
+        :param etag: the file's ETag, if the server gave one
+        :type etag: str
+        :return: the file's digest
+        :rtype: str
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, "objects"))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            digest = sha256.hexdigest()
+            path = self.path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock, self._db:
+            self._db.execute(
+                """
+                INSERT INTO objects (digest, size, etag, last_used)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (digest) DO UPDATE SET
+                    etag = coalesce(excluded.etag, etag),
+                    last_used = excluded.last_used
+                """,
+                (digest, size, etag, time.time()),
+            )
+
+        self.evict(keep=digest)
+
+        return digest
+
+    def link(self, request_id, filename, digest, uploaded_at=None):
+        """
+        Attach a stored file to a request under the given filename.
+
+        :param uploaded_at: the attachment's upload date
+        :type uploaded_at: datetime.date
+        """
+        if uploaded_at is not None:
+            uploaded_at = uploaded_at.isoformat()
+
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO links "
+                "(request_id, filename, digest, uploaded_at) "
+                "VALUES (?, ?, ?, ?)",
+                (str(request_id), filename, digest, uploaded_at),
+            )
+            self._touch(digest)
+
+    def size(self):
+        """
+        :return: total size in bytes of the stored files
+        :rtype: int
+        """
+        with self._lock:
+            (size,) = self._db.execute(
+                "SELECT coalesce(sum(size), 0) FROM objects"
+            ).fetchone()
+        return size
+
+    def evict(self, keep=None):
+        """
+        Remove the least recently used files, and their links, until the
+        store is under max_bytes.
+
+        :param keep: digest of a file not to remove
+        :type keep: str
+        """
+        if self.max_bytes is None:
+            return
+
+        with self._lock, self._db:
+            (total,) = self._db.execute(
+                "SELECT coalesce(sum(size), 0) FROM objects"
+            ).fetchone()
+
+            rows = self._db.execute(
+                "SELECT digest, size FROM objects ORDER BY last_used"
+            ).fetchall()
+
+            for digest, size in rows:
+                if total <= self.max_bytes:
+                    break
+                elif digest == keep:
+                    continue
+
+                self._db.execute("DELETE FROM links WHERE digest = ?", (digest,))
+                self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+                try:
+                    os.remove(self.path(digest))
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def close(self):
+        self._db.close()
+
+    def _find(self, etag, size):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT digest FROM objects WHERE etag = ? AND size = ?",
+                (etag, size),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _touch(self, digest):
+        self._db.execute(
+            "UPDATE objects SET last_used = ? WHERE digest = ?",
+            (time.time(), digest),
+        )
@@ -1,24 +1,70 @@
+import html
+import io
 import re
+import threading
+import time
 from datetime import datetime
 import dateutil.parser
 from urllib.parse import parse_qs, urlparse
 
-import jsonschema
+import lxml.etree
 import lxml.html
 import scrapelib
+from requests.cookies import RequestsCookieJar
 
-from .input_types import (
-    Captcha,
-    CheckBox,
-    ComboBox,
-    Input,
-    Password,
-    Phone,
-    RadioGroup,
-    TextArea,
+from .postback import PostbackState
+from .transport import Transport
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/111.0"
+
+_ATTACHMENT_URL_PATTERN = re.compile(
+    r'<input\b(?=[^>]*\bid="[^"]*(?:hdnAWSUrl|hdnAzureURL))[^>]*\bvalue="([^"]*)"',
+    re.IGNORECASE,
+)
+
+# text that marks a page as one of GovQA's error pages, and the status code
+# it stands for
+_ERROR_PAGES = (
+    ("There was a problem serving the requested page", 500),
+    ("Page Temporarily Unavailable", 503),
 )
 
 
+class _DomainThrottle:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_request = 0
+
+
+class _ErrorPageReader:
+    """
+    Streamed response body that raises for an error page as it is read, as
+    GovQA.request does for bodies that are read all at once.
+    """
+
+    _markers = [(marker.encode(), status_code) for marker, status_code in _ERROR_PAGES]
+
+    # enough of the previous chunk to catch a marker split across chunks
+    _overlap = max(len(marker) for marker, _ in _markers) - 1
+
+    def __init__(self, response, source):
+        self.response = response
+        self.source = source
+        self._tail = b""
+
+    def read(self, size=-1):
+        chunk = self.source.read(size)
+
+        window = self._tail + chunk
+        for marker, status_code in self._markers:
+            if marker in window:
+                self.response.status_code = status_code
+                raise scrapelib.HTTPError(self.response)
+
+        self._tail = window[-self._overlap :]
+        return chunk
+
+
 class UnauthenticatedError(RuntimeError):
     pass
 
@@ -39,6 +85,10 @@ class UnsupportedSite(RuntimeError):
     pass
 
 
+class MissingPostbackState(RuntimeError):
+    pass
+
+
 class GovQA(scrapelib.Scraper):
     """
     Client for programmatically interacting with GovQA instances.
@@ -46,34 +96,142 @@ class GovQA(scrapelib.Scraper):
     :param domain: Root domain of the GovQA instance to interact with, e.g.,
         https://governorny.govqa.us
     :type domain: str
+    :param transport: Connection pool, keep-alive and timeout settings.
+        Defaults to ``Transport()``.
+    :type transport: govqa.Transport
+    :param cassette: Record the client's traffic to, or replay it from, a
+        cassette file.
+    :type cassette: govqa.Cassette
+    :param parse_cache: Cache of parsed pages, so that get_request and
+        list_requests only parse pages that have changed. Pages are cached
+        per account, so one cache can be shared by forked clients.
+    :type parse_cache: govqa.ParseCache
     """
 
-    def __init__(self, domain, *args, **kwargs):
+    def __init__(
+        self,
+        domain,
+        *args,
+        transport=None,
+        cassette=None,
+        parse_cache=None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
 
+        self._domain_throttle = _DomainThrottle()
+
+        self.parse_cache = parse_cache
+
+        self.transport = transport or Transport()
+        self.transport.mount(self)
+
+        if cassette is not None:
+            cassette.mount(self)
+
+        self._postback_states = {}
+
+        # the account that's logged in, if any
+        self.username = None
+
         self.domain = domain.rstrip("/")
 
         response = self.get(self.url_from_endpoint(""), allow_redirects=True)
 
-        if "supporthome.aspx" not in response.url.lower():
+        if not self._is_supported(response):
             raise UnsupportedSite(f"{domain} does not seem to be a valid GovQA site")
 
         self.headers.update(
             {
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:109.0) Gecko/20100101 Firefox/111.0",
+                "User-Agent": USER_AGENT,
             }
         )
 
-    def request(self, *args, **kwargs):
-        response = super().request(*args, **kwargs)
+    def fork(self):
+        """
+        Get a client for the same GovQA instance with its own cookies, so
+        that it can be logged into a different account. The new client
+        shares this one's connection pool, throttle, and caches, and does
+        not check the domain again.
+
+        :returns: a logged-out client for the same instance
+        :rtype: GovQA
+        """
+        client = object.__new__(type(self))
+        client.__dict__.update(self.__dict__)
+
+        client.cookies = RequestsCookieJar()
+        client.headers = self.headers.copy()
+        client._postback_states = {}
+        client.username = None
+
+        return client
+
+    def _throttle(self):
+        # forked clients share one throttle, so that together they keep to
+        # requests_per_minute
+        with self._domain_throttle.lock:
+            now = time.time()
+            diff = self._request_frequency - (now - self._domain_throttle.last_request)
+            if diff > 0:
+                time.sleep(diff)
+            self._domain_throttle.last_request = time.time()
+
+    @staticmethod
+    def _is_supported(response):
+        return "supporthome.aspx" in response.url.lower()
+
+    @staticmethod
+    def probe_many(domains, max_workers=16, timeout=10, store=None):
+        """
+        Check many domains at once for live GovQA instances, without setting
+        up a client for each.
+
+        :param domains: Root domains to check, e.g.,
+                        https://governorny.govqa.us. The scheme defaults to
+                        https if it is left off.
+        :type domains: iterable
+        :param max_workers: Number of domains to check at the same time
+        :type max_workers: int
+        :param timeout: Seconds to wait on each domain, or a (connect, read)
+                        tuple
+        :type timeout: float or tuple
+        :param store: Cache of earlier results. Domains with a fresh result
+                      in the store are not checked again, and new results
+                      are added to it.
+        :type store: govqa.ProbeStore
+        :return: Dictionary of dictionaries containing the status
+                 ("supported", "unsupported", or "error"), the final URL,
+                 the request types linked from the instance's home page, any
+                 error message, and when the domain was checked. It's keyed
+                 by normalized domain, not as the domain was given: the
+                 scheme is added if it was left off, and any trailing slash
+                 is removed, e.g., "governorny.govqa.us/" is keyed as
+                 "https://governorny.govqa.us".
+        :rtype: dict
+        """
+        from .probe import probe_many
+
+        return probe_many(domains, max_workers, timeout, store)
 
-        if "There was a problem serving the requested page" in response.text:
-            response.status_code = 500
-            raise scrapelib.HTTPError(response)
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
 
-        elif "Page Temporarily Unavailable" in response.text:
-            response.status_code = 503
-            raise scrapelib.HTTPError(response)
+        # leave streamed bodies, i.e. attachment downloads, unread
+        if kwargs.get("stream"):
+            return response
+
+        for marker, status_code in _ERROR_PAGES:
+            if marker in response.text:
+                response.status_code = status_code
+                raise scrapelib.HTTPError(response)
+
+        # only file the state under the URL that was asked for if that's the
+        # page we got, and not one we were redirected to
+        if kwargs.get("params") or response.history:
+            self._update_postback_state(response)
+        else:
+            self._update_postback_state(response, url)
 
         return response
 
@@ -87,6 +245,8 @@ class GovQA(scrapelib.Scraper):
         :returns: an helper for creating a new account
         :rtype: CreateAccountForm
         """
+        from .forms import CreateAccountForm
+
         return CreateAccountForm(self)
 
     def request_form(self, request_type=1):
@@ -101,6 +261,8 @@ class GovQA(scrapelib.Scraper):
         :rtype: RequestForm
 
         """
+        from .forms import RequestForm
+
         return RequestForm(self, request_type)
 
     def login(self, username, password):
@@ -112,14 +274,20 @@ class GovQA(scrapelib.Scraper):
         :param password: password for thie site
         :type password: str
         """
-        response = self.get(
-            self.url_from_endpoint("Login.aspx"),
-            allow_redirects=True,
-        )
-
-        tree = lxml.html.fromstring(response.text)
+        # the login page's postback state is kept from the last time we saw
+        # it (e.g., a failed login), so we only need to fetch it when we
+        # haven't
+        login_url = self.url_from_endpoint("Login.aspx")
+        postback = self._postback_state(login_url)
+        if not postback:
+            response = self.get(login_url, allow_redirects=True)
+            postback = self._postback_state(response.url)
+            if not postback:
+                raise MissingPostbackState(
+                    f"Couldn't find the login form's ViewState at {response.url}"
+                )
 
-        payload = self._secrets(tree, response)
+        payload = postback.payload()
         payload.update(
             {
                 "ASPxFormLayout1$txtUsername": username,
@@ -128,7 +296,7 @@ class GovQA(scrapelib.Scraper):
             }
         )
 
-        response = self.post(response.url, data=payload, allow_redirects=True)
+        response = self.post(postback.url, data=payload, allow_redirects=True)
 
         try:
             self._check_logged_in(response)
@@ -137,35 +305,29 @@ class GovQA(scrapelib.Scraper):
                 "Couldn't log in, check your username and password"
             )
 
-    def _secrets(self, tree, response):
-        viewstate = tree.xpath("//input[@id='__VIEWSTATE']")[0].value
-
-        viewstategenerator = tree.xpath("//input[@id='__VIEWSTATEGENERATOR']")[0].value
-        request_verification_token = tree.xpath(
-            "//input[@name='__RequestVerificationToken']"
-        )[0].value
-
-        payload = {
-            "__EVENTTARGET": "",
-            "__EVENTARGUMENT": "",
-            "__VIEWSTATE": viewstate,
-            "__RequestVerificationToken": request_verification_token,
-            "__VIEWSTATEGENERATOR": viewstategenerator,
-            "__VIEWSTATEENCRYPTED": "",
-        }
+        self.username = username
+
+        # the login page's state doesn't survive logging in, so fetch it fresh
+        # next time
+        for url in (login_url, postback.url):
+            self._postback_states.pop(self._postback_key(url), None)
+
+    def _postback_state(self, url):
+        return self._postback_states.get(self._postback_key(url))
 
-        fieldcounts = tree.xpath("//input[@id='__VIEWSTATEFIELDCOUNT']")
-        if fieldcounts:
-            viewstatefieldcount = int(fieldcounts[0].value)
-            for higher_viewstate in range(1, viewstatefieldcount):
-                viewstate = tree.xpath(f"//input[@id='__VIEWSTATE{higher_viewstate}']")[
-                    0
-                ].value
-                payload[f"__VIEWSTATE{higher_viewstate}"] = viewstate
+    def _postback_key(self, url):
+        return urlparse(url)._replace(fragment="").geturl().lower()
 
-                payload["__VIEWSTATEFIELDCOUNT"] = str(viewstatefieldcount)
+    def _update_postback_state(self, response, *urls):
+        fields = PostbackState.parse(response.text)
+        if not fields:
+            return
 
-        return payload
+        for url in {response.url, *urls}:
+            key = self._postback_key(url)
+            state = self._postback_states.setdefault(key, PostbackState(response.url))
+            state.url = response.url
+            state.fields = fields
 
     def list_requests(self):
         """
@@ -184,6 +346,13 @@ class GovQA(scrapelib.Scraper):
 
         self._check_logged_in(response)
 
+        if self.parse_cache is not None:
+            cache_key = f"{self.domain} {self.username} list_requests"
+            digest = self._page_digest(response.text)
+            cached = self.parse_cache.get(cache_key, digest)
+            if cached is not None:
+                return cached
+
         tree = lxml.html.fromstring(response.text)
 
         request_links = tree.xpath("//a[contains(@id, 'referenceLnk')]")
@@ -201,6 +370,9 @@ class GovQA(scrapelib.Scraper):
                 }
             )
 
+        if self.parse_cache is not None:
+            self.parse_cache.set(cache_key, digest, requests)
+
         return requests
 
     def get_request(self, request_id):
@@ -225,6 +397,15 @@ class GovQA(scrapelib.Scraper):
 
         self._check_logged_in(response)
 
+        if self.parse_cache is not None:
+            cache_key = f"{self.domain} {self.username} get_request {request_id}"
+            digest = self._page_digest(response.text)
+            cached = self.parse_cache.get(cache_key, digest)
+            if cached is not None and self._refresh_attachment_urls(
+                cached, response.text
+            ):
+                return cached
+
         tree = lxml.html.fromstring(response.text)
 
         request = {
@@ -243,32 +424,7 @@ class GovQA(scrapelib.Scraper):
         }
 
         for message in tree.xpath("//table[contains(@id, 'rptMessageHistory')]"):
-            (sender,) = message.xpath(".//span[contains(@class, 'dxrpHT')]/text()")
-
-            parsed_sender = re.match(
-                r"^ On (?P<date>\d{1,2}\/\d{1,2}\/\d{4}) (?P<time>\d{1,2}:\d{1,2}:\d{1,2} (A|P)M), (?P<name>.*) wrote:$",
-                sender,
-            )
-
-            body = message.xpath(
-                ".//div[contains(@class, 'dxrpCW')]/text()"
-            ) + message.xpath(".//div[contains(@class, 'dxrpCW')]/descendant::*/text()")
-
-            if "Click Here to View Entire Message" in body:
-                (link,) = message.xpath(".//div[contains(@class, 'dxrpCW')]/a")
-                onclick = link.attrib["onclick"]
-                truncated_message_path = re.search(r"\('(.*)'\)", onclick).group(1)
-                body = self._parse_truncated_message(truncated_message_path)
-
-            request["messages"].append(
-                {
-                    "id": message.attrib["id"].split("_")[-1],
-                    "sender": parsed_sender.group("name"),
-                    "date": parsed_sender.group("date"),
-                    "time": parsed_sender.group("time"),
-                    "body": re.sub(r"\s+", " ", " ".join(body)).strip(),
-                }
-            )
+            request["messages"].append(self._parse_message(message))
 
         attachment_links = tree.xpath(
             "//div[@id='dvAttachments']/descendant::div[@class='qac_attachment']/input[contains(@id, 'hdnAWSUrl') or contains(@id, 'hdnAzureURL')]"
@@ -278,13 +434,7 @@ class GovQA(scrapelib.Scraper):
             if "value" in link.attrib:
                 url = link.attrib["value"]
                 uploaded_at_str = link.xpath("../../../td[1]/text()")[0].strip()
-                metadata = parse_qs(urlparse(url).query)
-                if "response-content-disposition" in metadata:
-                    content_disposition = metadata["response-content-disposition"][0]
-                    expires = datetime.fromtimestamp(int(metadata["Expires"][0]))
-                elif "rscd" in metadata:
-                    content_disposition = metadata["rscd"][0]
-                    expires = dateutil.parser.parse(metadata["se"][0])
+                content_disposition, expires = self._attachment_url_metadata(url)
                 request["attachments"].append(
                     {
                         "url": link.attrib["value"],
@@ -294,345 +444,185 @@ class GovQA(scrapelib.Scraper):
                     }
                 )
 
-        return request
+        if self.parse_cache is not None:
+            self.parse_cache.set(cache_key, digest, request)
 
-    def _parse_truncated_message(self, truncated_message_endpoint):
-        truncated_message_url = self.url_from_endpoint(truncated_message_endpoint)
-        response = self.get(truncated_message_url)
-        tree = lxml.html.fromstring(response.text)
-        body = tree.xpath(".//div[@id='divMessage']//text()")
-        return body
+        return request
 
-    def _check_logged_in(self, response):
-        results = re.search('dtrum.identifyUser\("(.*)"\);', response.text).group(1)
-        if not results.split(";")[-1]:
-            raise UnauthenticatedError(
-                "This method requires authentication, please run the `login` method before calling this method"
+    def _page_digest(self, source_text):
+        # only clients with a parse cache need the cache module (and sqlite3)
+        from .cache import page_digest
+
+        return page_digest(source_text)
+
+    def _attachment_url_metadata(self, url):
+        metadata = parse_qs(urlparse(url).query)
+        if "response-content-disposition" in metadata:
+            content_disposition = metadata["response-content-disposition"][0]
+            expires = datetime.fromtimestamp(int(metadata["Expires"][0]))
+        elif "rscd" in metadata:
+            content_disposition = metadata["rscd"][0]
+            expires = dateutil.parser.parse(metadata["se"][0])
+        return content_disposition, expires
+
+    def _refresh_attachment_urls(self, request, source_text):
+        # attachment URLs are signed, and re-signed every time the page is
+        # loaded, so a cached request needs the new ones
+        urls = [
+            html.unescape(url) for url in _ATTACHMENT_URL_PATTERN.findall(source_text)
+        ]
+        if len(urls) != len(request["attachments"]):
+            return False
+
+        for attachment, url in zip(request["attachments"], urls):
+            content_disposition, expires = self._attachment_url_metadata(url)
+            attachment.update(
+                {
+                    "url": url,
+                    "content-disposition": content_disposition,
+                    "expires": expires,
+                }
             )
 
+        return True
 
-class Form:
-    def _process_inputs(self, required_inputs_tables, tree, response):
-        self.required_inputs = self._inputs(required_inputs_tables, response.text)
-
-        self.schema = self._generate_schema(self.required_inputs)
-
-        self._payload = self._form_values(tree, "request")
-        self._payload.update(self._session._secrets(tree, response))
-        self._payload["__EVENTTARGET"] = "btnSaveData"
-
-        captcha = Captcha(self._session, tree, **self._captcha_config)
-        self.captcha = captcha.info
-        """ docs """
+    def iter_messages(self, request_id):
+        """
+        Retrieve the messages of a request one at a time, as the page is
+        downloaded, rather than all at once. Memory use stays flat however
+        long the request's correspondence is, except that a truncated
+        message, and any after it, are held until the page has been read,
+        since fetching a truncated message's full text takes another request.
 
-        if self.captcha:
-            self.schema["properties"]["captcha"] = {
-                "type": "string",
-                "pattern": "^[A-Z0-9]{4,6}$",
-            }
-            self.schema["required"].append("captcha")
-            self.required_inputs["captcha"] = captcha
-
-    def _reset_payload(self, tree, response):
-        captcha = Captcha(self._session, tree, **self._captcha_config)
-        self.captcha = captcha.info
-        if "captcha" in self.required_inputs:
-            self.required_inputs["captcha"] = captcha
-        self._payload.update(self._session._secrets(tree, response))
-
-    def _form_values(self, tree, form_prefix):
-        form_inputs = tree.xpath(
-            f".//table[tr/td/label[starts-with(@for, '{form_prefix}')]]//input[not(@type='hidden')] | "
-            f".//table[tr/td/label[starts-with(@for, '{form_prefix}')]]//textarea | "
-            f".//table[tr/td/span[starts-with(@id, '{form_prefix}')]]//input"
-        )
+        :param request_id: Identifier of the request, i.e., the "id"
+                           from a request dictionary returned by
+                           list_requests().
+        :type request_id: int
+        :return: Iterator of message dictionaries, as in the "messages" of
+                 get_request()
+        :rtype: iterator
+        """
 
-        form_values = {}
+        held = []
 
-        for form_input in form_inputs:
-            name = form_input.attrib["name"]
-            is_radio_box = name.rsplit("$", 1)[-1].startswith("RB")
-            if is_radio_box:
-                form_values[name] = "U"
+        with self.get(
+            self.url_from_endpoint("RequestEdit.aspx"),
+            params={"rid": request_id},
+            stream=True,
+        ) as response:
+            if hasattr(response.raw, "read"):
+                response.raw.decode_content = True
+                source = response.raw
             else:
-                form_values[name] = ""
-                form_values[f"{name}$State"] = '{"validationState":""}'
-
-        return form_values
-
-    def _inputs(self, required_inputs_tables, source_text):
-        required_inputs = {}
-
-        is_password = False
-        password = None
-        confirm_password_table = None
-
-        for table in required_inputs_tables:
-            if table.xpath(".//input[@role='combobox']"):
-                klass = ComboBox
-            elif table.xpath(".//textarea"):
-                klass = TextArea
-            elif table.xpath(".//table[@role='radiogroup']"):
-                klass = RadioGroup
-            elif table.xpath(".//span[@role='checkbox']"):
-                klass = CheckBox
-            elif table.xpath(
-                ".//input[@name='customerInfo$CustomerFormLayout$txtPhoneMask']"
-            ):
-                klass = Phone
-            elif table.xpath(
-                ".//input[@name='customerInfo$CustomerFormLayout$txtPassword']"
+                source = io.BytesIO(response.content)
+
+            for _, element in lxml.etree.iterparse(
+                _ErrorPageReader(response, source),
+                events=("end",),
+                tag=("table", "script"),
+                html=True,
+                encoding=response.encoding,
             ):
-                is_password = True
-                klass = Password
-            elif table.xpath(
-                ".//input[@name='customerInfo$CustomerFormLayout$txtConfirmPassword']"
-            ):
-                # we'll handle the confirm-password inputs in the password input
-                confirm_password_table = table
-                continue
-            else:
-                klass = Input
-
-            input_element = klass(table, source_text)
-            required_inputs[input_element.label] = input_element
-            if is_password:
-                password = input_element
-                is_password = False
-
-        if confirm_password_table is not None:
-            password.add_confirmation(confirm_password_table)
-
-        return required_inputs
-
-    def _generate_schema(self, required_inputs):
-        properties = {
-            key: element.properties for key, element in required_inputs.items()
-        }
-        schema = {
-            "type": "object",
-            "properties": properties,
-            "required": list(properties),
-            "additionalProperties": False,
-        }
-
-        jsonschema.Draft7Validator.check_schema(schema)
-
-        return schema
-
-
-class CreateAccountForm(Form):
-    """
-    Wrapper for interacting with a site's account creation form
-
-    Attributes:
-       captcha (dict or None): Dictionary of captcha jpeg and wav files as
-                               BytesIO objects, if the the form has a captcha.
-                               Otherwise, captcha has a value of None.
-       schema (dict): A `JSON Schema <https://json-schema.org/>`_ representing
-                      the required fields to create an account and their
-                      format.
-    """
-
-    _captcha_config = {
-        "img_id": "c_customerdetails_captchaformlayout_captcha_CaptchaImage",
-        "wav_link_id": "c_customerdetails_captchaformlayout_captcha_SoundLink",
-        "input_name": "captchaFormLayout$CaptchaCodeTextBox",
-        "captcha_hash_input_name": "BDC_VCID_c_customerdetails_captchaformlayout_captcha",
-        "workaround_input_name": "BDC_BackWorkaround_c_customerdetails_captchaformlayout_captcha",
-    }
-
-    def __init__(self, session):
-        self._session = session
-
-        response = self._create_account_page()
-        self.account_creation_page = response.request.url
-
-        tree = lxml.html.fromstring(response.text)
-
-        # find the table elements that are direct ancestors of labels
-        # that have an <em> next to them indicating a required field
-        required_inputs_tables = tree.xpath(
-            ".//table[tr/td/label[starts-with(@for, 'customer') and following-sibling::em]] | "
-            ".//table[tr/td/span[starts-with(@id, 'customer') and following-sibling::em]]"
-        )
-
-        self._process_inputs(required_inputs_tables, tree, response)
-
-    def _create_account_page(self):
-        response = self._session.get(
-            self._session.url_from_endpoint("Login.aspx"), allow_redirects=True
+                if element.tag == "script":
+                    if element.text and "dtrum.identifyUser" in element.text:
+                        self._check_identified_user(element.text)
+                    continue
+
+                if "rptMessageHistory" not in element.get("id", ""):
+                    continue
+
+                message, truncated_message_path = self._read_message(element)
+
+                # fetching a truncated message's full text needs a connection
+                # of its own, so it, and the messages after it, wait until
+                # this page is read and its connection is free again
+                if truncated_message_path is not None or held:
+                    held.append((message, truncated_message_path))
+                else:
+                    yield message
+
+                # free the message, and whatever came before it, unless it's
+                # nested in a message we haven't finished with
+                if not any(
+                    "rptMessageHistory" in ancestor.get("id", "")
+                    for ancestor in element.iterancestors("table")
+                ):
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+
+        for message, truncated_message_path in held:
+            if truncated_message_path is not None:
+                self._fill_truncated_message(message, truncated_message_path)
+            yield message
+
+    def _parse_message(self, message):
+        parsed, truncated_message_path = self._read_message(message)
+        if truncated_message_path is not None:
+            self._fill_truncated_message(parsed, truncated_message_path)
+        return parsed
+
+    def _read_message(self, message):
+        # returns the message as it appears on the page, and, if it's
+        # truncated there, the path to the page with all of it
+        (sender,) = message.xpath(".//span[contains(@class, 'dxrpHT')]/text()")
+
+        parsed_sender = re.match(
+            r"^ On (?P<date>\d{1,2}\/\d{1,2}\/\d{4}) (?P<time>\d{1,2}:\d{1,2}:\d{1,2} (A|P)M), (?P<name>.*) wrote:$",
+            sender,
         )
 
-        tree = lxml.html.fromstring(response.text)
-
-        (create_user_link,) = tree.xpath("//a[@id='lnkCreateUser']")
-
-        response = self._session.get(
-            self._session.url_from_endpoint(create_user_link.attrib["href"]),
-            allow_redirects=True,
-        )
-
-        return response
-
-    def submit(self, required_inputs):
-        """
-        Submit fields to create a new account. If the submission is
-        unsuccessful, the captcha will be refreshed.
-
-        :param required_inputs: dictionary containing the field values for
-                                creating a new account. If the dictionary is
-                                not compatible with the :ref:`schema` then an
-                                informative error will be raised.
-        :type required_inputs: dict
-        :returns: Returns True if account created successfully
-        :rtype: bool
-        """
-
-        jsonschema.validate(required_inputs, self.schema)
-
-        payload = self._payload.copy()
-        payload.update(
-            {
-                post_key: value
-                for form_key, input_string in required_inputs.items()
-                for post_key, value in self.required_inputs[form_key].fill(input_string)
-            }
-        )
-
-        try:
-            response = self._session.post(self.account_creation_page, data=payload)
-        except scrapelib.HTTPError as error:
-            # Unfortunately, we don't get a clean success page, but if we
-            # get redirected to the Home Page then we have been successful
-            if "CustomerHome.aspx" in error.response.request.url:
-                return True
-            else:
-                raise
-        else:
-            tree = lxml.html.fromstring(response.text)
-
-            form_validation_errors = tree.xpath(
-                '//div[@id="header_errors1"]//li/text()'
-            )
-
-            if not len(form_validation_errors):
-                raise FormValidationError(
-                    "The form did not validate for an unknown reason."
-                )
-
-            if "Email address already exists." in form_validation_errors:
-                raise EmailAlreadyExists(
-                    "The email address already exists in this instance."
-                )
-
-            self._reset_payload(tree, response)
-
-            if "The submitted code is incorrect." in form_validation_errors:
-                raise IncorrectCaptcha("The submitted captcha was incorrect")
-
-            for error in form_validation_errors:
-                raise FormValidationError(
-                    f'The form did not validate. The website reports this error: "{error}"'
-                )
-
-
-class RequestForm(Form):
-    """
-    Wrapper for interacting with the site's form to submit a new record
-    request.
-
-    Attributes:
-       captcha (dict or None): Dictionary of captcha jpeg and wav files as
-                               BytesIO objects, if the the form has a captcha.
-                               Otherwise, captcha has a value of None.
-       schema (dict): A `JSON Schema <https://json-schema.org/>`_ representing
-                      the required fields to create a new record request.
-    """
-
-    _captcha_config = {
-        "img_id": "c_requestopen_captchaformlayout_reqstopencaptcha_CaptchaImage",
-        "wav_link_id": "c_requestopen_captchaformlayout_reqstopencaptcha_SoundLink",
-        "input_name": "captchaFormLayout$reqstOpenCaptchaTextBox",
-        "captcha_hash_input_name": "BDC_VCID_c_requestopen_captchaformlayout_reqstopencaptcha",
-        "workaround_input_name": "BDC_BackWorkaround_c_requestopen_captchaformlayout_reqstopencaptcha",
-    }
-
-    def __init__(self, session, request_type):
-        self._session = session
+        body = message.xpath(
+            ".//div[contains(@class, 'dxrpCW')]/text()"
+        ) + message.xpath(".//div[contains(@class, 'dxrpCW')]/descendant::*/text()")
+
+        truncated_message_path = None
+        if "Click Here to View Entire Message" in body:
+            (link,) = message.xpath(".//div[contains(@class, 'dxrpCW')]/a")
+            onclick = link.attrib["onclick"]
+            truncated_message_path = re.search(r"\('(.*)'\)", onclick).group(1)
+
+        parsed = {
+            "id": message.attrib["id"].split("_")[-1],
+            "sender": parsed_sender.group("name"),
+            "date": parsed_sender.group("date"),
+            "time": parsed_sender.group("time"),
+            "body": self._message_body(body),
+        }
 
-        response = self._session.get(
-            self._session.url_from_endpoint("RequestOpen.aspx"),
-            params={"rqst": request_type},
-        )
+        return parsed, truncated_message_path
 
-        self._session._check_logged_in(response)
+    def _fill_truncated_message(self, message, truncated_message_path):
+        body = self._parse_truncated_message(truncated_message_path)
+        message["body"] = self._message_body(body)
 
-        self.request_url = response.url
+    def _message_body(self, body):
+        return re.sub(r"\s+", " ", " ".join(body)).strip()
 
+    def _parse_truncated_message(self, truncated_message_endpoint):
+        truncated_message_url = self.url_from_endpoint(truncated_message_endpoint)
+        response = self.get(truncated_message_url)
         tree = lxml.html.fromstring(response.text)
+        body = tree.xpath(".//div[@id='divMessage']//text()")
+        return body
 
-        # find the table elements that are direct ancestors of labels
-        # that have an <em> next to them indicating a required field
-        required_inputs_tables = tree.xpath(
-            ".//table[tr/td/label[starts-with(@for, 'request') and following-sibling::em]] | "
-            ".//table[tr/td/span[starts-with(@id, 'request') and following-sibling::em]]"
-        )
-
-        self._process_inputs(required_inputs_tables, tree, response)
-
-    def submit(self, required_inputs):
-        """
-        Submit fields to create a new record request. If the submission is
-        unsuccessful, the captcha will be refreshed.
-
-        :param required_inputs: dictionary containing the field values for
-                                creating a new record request. If the
-                                dictionary is not compatible with the
-                                :ref:`schema` then an informative error will be
-                                raised.
-        :type required_inputs: dict
-        :returns: Returns the reference number if record request created
-                  successfully
-        :rtype: str
-        """
-
-        jsonschema.validate(required_inputs, self.schema)
-
-        payload = self._payload.copy()
-        payload.update(
-            {
-                post_key: value
-                for form_key, input_string in required_inputs.items()
-                for post_key, value in self.required_inputs[form_key].fill(input_string)
-            }
-        )
-
-        response = self._session.post(self.request_url, data=payload)
-
-        tree = lxml.html.fromstring(response.text)
+    def _check_logged_in(self, response):
+        self._check_identified_user(response.text)
 
-        try:
-            reference_number = tree.xpath(
-                './/span[@id="ConfirmFormLayout_roReferenceNo"]'
-            )[0].text
-            return reference_number
-        except IndexError:
-            form_validation_errors = tree.xpath(
-                '//div[@id="header_errors1"]//li/text()'
+    def _check_identified_user(self, source_text):
+        results = re.search('dtrum.identifyUser\("(.*)"\);', source_text).group(1)
+        if not results.split(";")[-1]:
+            raise UnauthenticatedError(
+                "This method requires authentication, please run the `login` method before calling this method"
             )
 
-            if not len(form_validation_errors):
-                raise FormValidationError(
-                    "The form did not validate for an unknown reason."
-                )
 
-            self._reset_payload(tree, payload)
+def __getattr__(name):
+    # the form machinery (and jsonschema) is only imported once it's needed,
+    # so that clients that only read requests start up quickly
+    if name in {"Form", "CreateAccountForm", "RequestForm"}:
+        from . import forms
 
-            if "The submitted CAPTCHA code is incorrect" in form_validation_errors:
-                raise IncorrectCaptcha("The submitted captcha was incorrect")
+        return getattr(forms, name)
 
-            for error in form_validation_errors:
-                raise FormValidationError(
-                    f'The form did not validate. The website reports this error: "{error}"'
-                )
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
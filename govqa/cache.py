@@ -0,0 +1,110 @@
+import collections
+import copy
+import hashlib
+import pickle
+import re
+import sqlite3
+import threading
+
+_SCRIPT_PATTERN = re.compile(r"<script\b.*?</script>", re.IGNORECASE | re.DOTALL)
+_INPUT_PATTERN = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+_VALUE_PATTERN = re.compile(r"""\bvalue\s*=\s*(?:"[^"]*"|'[^']*')""", re.IGNORECASE)
+_HIDDEN_PATTERN = re.compile(r"""\btype\s*=\s*["']?hidden\b""", re.IGNORECASE)
+
+
+def _strip_hidden_value(match):
+    element = match.group(0)
+    if _HIDDEN_PATTERN.search(element):
+        return _VALUE_PATTERN.sub("", element)
+    return element
+
+
+def page_digest(text):
+    """
+    Digest of the parts of a page that its parsed result depends on.
+
+    Scripts and the values of hidden inputs, which include the ViewState and
+    the signed attachment URLs, change on every load, so they are left out.
+    """
+    text = _SCRIPT_PATTERN.sub("", text)
+    text = _INPUT_PATTERN.sub(_strip_hidden_value, text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """
+    Cache of parsed pages, keyed by a digest of their content, so a page that
+    hasn't changed since it was last fetched isn't parsed again.
+
+    :param maxsize: Number of parsed pages to keep in memory. The least
+                    recently used are evicted first.
+    :type maxsize: int
+    :param path: SQLite file to also keep parsed pages in, so they outlive
+                 the process
+    :type path: str
+    """
+
+    def __init__(self, maxsize=256, path=None):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS pages "
+                    "(key TEXT PRIMARY KEY, digest TEXT NOT NULL, "
+                    "result BLOB NOT NULL)"
+                )
+        else:
+            self._db = None
+
+    def get(self, key, digest):
+        """
+        :return: the result stored under key, if it was parsed from a page
+                 with the same digest, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            elif self._db is not None:
+                row = self._db.execute(
+                    "SELECT digest, result FROM pages WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], pickle.loads(row[1]))
+                    self._remember(key, entry)
+
+        if entry is None or entry[0] != digest:
+            return None
+
+        # callers are free to modify what they get back
+        return copy.deepcopy(entry[1])
+
+    def set(self, key, digest, result):
+        entry = (digest, copy.deepcopy(result))
+
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO pages (key, digest, result) "
+                        "VALUES (?, ?, ?)",
+                        (key, digest, pickle.dumps(entry[1])),
+                    )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute("DELETE FROM pages")
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,152 @@
+import base64
+import collections
+import gzip
+import json
+import threading
+
+from requests.adapters import BaseAdapter
+
+from .transport import build_response
+
+
+class UnrecordedRequest(RuntimeError):
+    pass
+
+
+class Cassette:
+    """
+    Record every HTTP exchange a client makes to a file, or replay a
+    recorded file without touching the network.
+
+    Every hop is captured, including redirects, captcha images and audio,
+    and the pages fetched for truncated messages. Cassettes are gzipped JSON
+    lines, one exchange per line.
+
+    :param path: Location of the cassette file
+    :type path: str
+    :param mode: ``"record"`` to write the client's traffic to the
+                 cassette, or ``"replay"`` to answer requests from it.
+    :type mode: str
+    :param overwrite: In record mode, replace an existing cassette at path.
+                      Otherwise, recording over an existing cassette raises
+                      FileExistsError.
+    :type overwrite: bool
+    """
+
+    modes = ("record", "replay")
+
+    def __init__(self, path, mode="replay", overwrite=False):
+        if mode not in self.modes:
+            raise ValueError(f"mode must be one of {self.modes}, not {mode!r}")
+
+        self.path = path
+        self.mode = mode
+        self.overwrite = overwrite
+
+    def mount(self, session):
+        """
+        Route a session's traffic through the cassette.
+
+        :param session: the session to record or replay
+        :type session: scrapelib.Scraper
+        """
+        if self.mode == "record":
+            # exchanges are appended as they happen, so start from an empty
+            # file rather than after an earlier run's exchanges
+            with open(self.path, "xb" if not self.overwrite else "wb"):
+                pass
+
+        for prefix in ("https://", "http://"):
+            if self.mode == "record":
+                adapter = RecordingAdapter(self.path, session.get_adapter(prefix))
+            else:
+                adapter = ReplayAdapter(self.path)
+            session.mount(prefix, adapter)
+
+        if self.mode == "replay":
+            # there is no server to be polite to
+            session.requests_per_minute = 0
+
+
+def _request_key(request):
+    return request.method.upper(), request.url
+
+
+class RecordingAdapter(BaseAdapter):
+    _lock = threading.Lock()
+
+    def __init__(self, path, adapter):
+        super().__init__()
+        self.path = path
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        response = self.adapter.send(request, **kwargs)
+
+        original_response = getattr(response.raw, "_original_response", None)
+        if original_response is not None:
+            headers = list(original_response.msg.items())
+        else:
+            headers = list(response.headers.items())
+
+        method, url = _request_key(request)
+        exchange = {
+            "method": method,
+            "url": url,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": headers,
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+
+        # each write is its own gzip member, which gzip reads back as a
+        # single stream, so an interrupted run leaves a usable cassette
+        with self._lock, gzip.open(self.path, "at", encoding="utf-8") as f:
+            f.write(json.dumps(exchange, separators=(",", ":")) + "\n")
+
+        return build_response(
+            request,
+            response.status_code,
+            response.reason,
+            headers,
+            response.content,
+        )
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, path):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._exchanges = collections.defaultdict(collections.deque)
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                exchange = json.loads(line)
+                key = (exchange["method"], exchange["url"])
+                self._exchanges[key].append(exchange)
+
+    def send(self, request, **kwargs):
+        # requests to the same URL are answered in the order they were
+        # recorded
+        key = _request_key(request)
+        with self._lock:
+            try:
+                exchange = self._exchanges[key].popleft()
+            except IndexError:
+                raise UnrecordedRequest(
+                    f"The cassette has no recorded response for {key[0]} {key[1]}"
+                )
+
+        return build_response(
+            request,
+            exchange["status"],
+            exchange["reason"],
+            exchange["headers"],
+            base64.b64decode(exchange["body"]),
+        )
+
+    def close(self):
+        pass
@@ -0,0 +1,351 @@
+import jsonschema
+import lxml.html
+import scrapelib
+
+from .base import (
+    EmailAlreadyExists,
+    FormValidationError,
+    IncorrectCaptcha,
+    MissingPostbackState,
+)
+from .input_types import (
+    Captcha,
+    CheckBox,
+    ComboBox,
+    Input,
+    Password,
+    Phone,
+    RadioGroup,
+    TextArea,
+)
+
+
+class Form:
+    def _process_inputs(self, required_inputs_tables, tree, response):
+        self.required_inputs = self._inputs(required_inputs_tables, response.text)
+
+        self.schema = self._generate_schema(self.required_inputs)
+
+        # the session keeps this up to date with every response from the
+        # form's page, including failed submissions
+        self._postback = self._session._postback_state(response.url)
+        if self._postback is None:
+            raise MissingPostbackState(
+                f"Couldn't find the form's ViewState at {response.url}"
+            )
+
+        self._payload = self._form_values(tree, "request")
+        self._payload["__EVENTTARGET"] = "btnSaveData"
+
+        captcha = Captcha(self._session, tree, **self._captcha_config)
+        self.captcha = captcha.info
+        """ docs """
+
+        if self.captcha:
+            self.schema["properties"]["captcha"] = {
+                "type": "string",
+                "pattern": "^[A-Z0-9]{4,6}$",
+            }
+            self.schema["required"].append("captcha")
+            self.required_inputs["captcha"] = captcha
+
+    def _reset_captcha(self, tree):
+        captcha = Captcha(self._session, tree, **self._captcha_config)
+        self.captcha = captcha.info
+        if "captcha" in self.required_inputs:
+            self.required_inputs["captcha"] = captcha
+
+    def _build_payload(self, required_inputs):
+        payload = self._postback.payload()
+        payload.update(self._payload)
+        payload.update(
+            {
+                post_key: value
+                for form_key, input_string in required_inputs.items()
+                for post_key, value in self.required_inputs[form_key].fill(input_string)
+            }
+        )
+        return payload
+
+    def _form_values(self, tree, form_prefix):
+        form_inputs = tree.xpath(
+            f".//table[tr/td/label[starts-with(@for, '{form_prefix}')]]//input[not(@type='hidden')] | "
+            f".//table[tr/td/label[starts-with(@for, '{form_prefix}')]]//textarea | "
+            f".//table[tr/td/span[starts-with(@id, '{form_prefix}')]]//input"
+        )
+
+        form_values = {}
+
+        for form_input in form_inputs:
+            name = form_input.attrib["name"]
+            is_radio_box = name.rsplit("$", 1)[-1].startswith("RB")
+            if is_radio_box:
+                form_values[name] = "U"
+            else:
+                form_values[name] = ""
+                form_values[f"{name}$State"] = '{"validationState":""}'
+
+        return form_values
+
+    def _inputs(self, required_inputs_tables, source_text):
+        required_inputs = {}
+
+        is_password = False
+        password = None
+        confirm_password_table = None
+
+        for table in required_inputs_tables:
+            if table.xpath(".//input[@role='combobox']"):
+                klass = ComboBox
+            elif table.xpath(".//textarea"):
+                klass = TextArea
+            elif table.xpath(".//table[@role='radiogroup']"):
+                klass = RadioGroup
+            elif table.xpath(".//span[@role='checkbox']"):
+                klass = CheckBox
+            elif table.xpath(
+                ".//input[@name='customerInfo$CustomerFormLayout$txtPhoneMask']"
+            ):
+                klass = Phone
+            elif table.xpath(
+                ".//input[@name='customerInfo$CustomerFormLayout$txtPassword']"
+            ):
+                is_password = True
+                klass = Password
+            elif table.xpath(
+                ".//input[@name='customerInfo$CustomerFormLayout$txtConfirmPassword']"
+            ):
+                # we'll handle the confirm-password inputs in the password input
+                confirm_password_table = table
+                continue
+            else:
+                klass = Input
+
+            input_element = klass(table, source_text)
+            required_inputs[input_element.label] = input_element
+            if is_password:
+                password = input_element
+                is_password = False
+
+        if confirm_password_table is not None:
+            password.add_confirmation(confirm_password_table)
+
+        return required_inputs
+
+    def _generate_schema(self, required_inputs):
+        properties = {
+            key: element.properties for key, element in required_inputs.items()
+        }
+        schema = {
+            "type": "object",
+            "properties": properties,
+            "required": list(properties),
+            "additionalProperties": False,
+        }
+
+        jsonschema.Draft7Validator.check_schema(schema)
+
+        return schema
+
+
+class CreateAccountForm(Form):
+    """
+    Wrapper for interacting with a site's account creation form
+
+    Attributes:
+       captcha (dict or None): Dictionary of captcha jpeg and wav files as
+                               BytesIO objects, if the the form has a captcha.
+                               Otherwise, captcha has a value of None.
+       schema (dict): A `JSON Schema <https://json-schema.org/>`_ representing
+                      the required fields to create an account and their
+                      format.
+    """
+
+    _captcha_config = {
+        "img_id": "c_customerdetails_captchaformlayout_captcha_CaptchaImage",
+        "wav_link_id": "c_customerdetails_captchaformlayout_captcha_SoundLink",
+        "input_name": "captchaFormLayout$CaptchaCodeTextBox",
+        "captcha_hash_input_name": "BDC_VCID_c_customerdetails_captchaformlayout_captcha",
+        "workaround_input_name": "BDC_BackWorkaround_c_customerdetails_captchaformlayout_captcha",
+    }
+
+    def __init__(self, session):
+        self._session = session
+
+        response = self._create_account_page()
+        self.account_creation_page = response.request.url
+
+        tree = lxml.html.fromstring(response.text)
+
+        # find the table elements that are direct ancestors of labels
+        # that have an <em> next to them indicating a required field
+        required_inputs_tables = tree.xpath(
+            ".//table[tr/td/label[starts-with(@for, 'customer') and following-sibling::em]] | "
+            ".//table[tr/td/span[starts-with(@id, 'customer') and following-sibling::em]]"
+        )
+
+        self._process_inputs(required_inputs_tables, tree, response)
+
+    def _create_account_page(self):
+        response = self._session.get(
+            self._session.url_from_endpoint("Login.aspx"), allow_redirects=True
+        )
+
+        tree = lxml.html.fromstring(response.text)
+
+        (create_user_link,) = tree.xpath("//a[@id='lnkCreateUser']")
+
+        response = self._session.get(
+            self._session.url_from_endpoint(create_user_link.attrib["href"]),
+            allow_redirects=True,
+        )
+
+        return response
+
+    def submit(self, required_inputs):
+        """
+        Submit fields to create a new account. If the submission is
+        unsuccessful, the captcha will be refreshed.
+
+        :param required_inputs: dictionary containing the field values for
+                                creating a new account. If the dictionary is
+                                not compatible with the :ref:`schema` then an
+                                informative error will be raised.
+        :type required_inputs: dict
+        :returns: Returns True if account created successfully
+        :rtype: bool
+        """
+
+        jsonschema.validate(required_inputs, self.schema)
+
+        payload = self._build_payload(required_inputs)
+
+        try:
+            response = self._session.post(self.account_creation_page, data=payload)
+        except scrapelib.HTTPError as error:
+            # Unfortunately, we don't get a clean success page, but if we
+            # get redirected to the Home Page then we have been successful
+            if "CustomerHome.aspx" in error.response.request.url:
+                return True
+            else:
+                raise
+        else:
+            tree = lxml.html.fromstring(response.text)
+
+            form_validation_errors = tree.xpath(
+                '//div[@id="header_errors1"]//li/text()'
+            )
+
+            if not len(form_validation_errors):
+                raise FormValidationError(
+                    "The form did not validate for an unknown reason."
+                )
+
+            if "Email address already exists." in form_validation_errors:
+                raise EmailAlreadyExists(
+                    "The email address already exists in this instance."
+                )
+
+            self._reset_captcha(tree)
+
+            if "The submitted code is incorrect." in form_validation_errors:
+                raise IncorrectCaptcha("The submitted captcha was incorrect")
+
+            for error in form_validation_errors:
+                raise FormValidationError(
+                    f'The form did not validate. The website reports this error: "{error}"'
+                )
+
+
+class RequestForm(Form):
+    """
+    Wrapper for interacting with the site's form to submit a new record
+    request.
+
+    Attributes:
+       captcha (dict or None): Dictionary of captcha jpeg and wav files as
+                               BytesIO objects, if the the form has a captcha.
+                               Otherwise, captcha has a value of None.
+       schema (dict): A `JSON Schema <https://json-schema.org/>`_ representing
+                      the required fields to create a new record request.
+    """
+
+    _captcha_config = {
+        "img_id": "c_requestopen_captchaformlayout_reqstopencaptcha_CaptchaImage",
+        "wav_link_id": "c_requestopen_captchaformlayout_reqstopencaptcha_SoundLink",
+        "input_name": "captchaFormLayout$reqstOpenCaptchaTextBox",
+        "captcha_hash_input_name": "BDC_VCID_c_requestopen_captchaformlayout_reqstopencaptcha",
+        "workaround_input_name": "BDC_BackWorkaround_c_requestopen_captchaformlayout_reqstopencaptcha",
+    }
+
+    def __init__(self, session, request_type):
+        self._session = session
+
+        response = self._session.get(
+            self._session.url_from_endpoint("RequestOpen.aspx"),
+            params={"rqst": request_type},
+        )
+
+        self._session._check_logged_in(response)
+
+        self.request_url = response.url
+
+        tree = lxml.html.fromstring(response.text)
+
+        # find the table elements that are direct ancestors of labels
+        # that have an <em> next to them indicating a required field
+        required_inputs_tables = tree.xpath(
+            ".//table[tr/td/label[starts-with(@for, 'request') and following-sibling::em]] | "
+            ".//table[tr/td/span[starts-with(@id, 'request') and following-sibling::em]]"
+        )
+
+        self._process_inputs(required_inputs_tables, tree, response)
+
+    def submit(self, required_inputs):
+        """
+        Submit fields to create a new record request. If the submission is
+        unsuccessful, the captcha will be refreshed.
+
+        :param required_inputs: dictionary containing the field values for
+                                creating a new record request. If the
+                                dictionary is not compatible with the
+                                :ref:`schema` then an informative error will be
+                                raised.
+        :type required_inputs: dict
+        :returns: Returns the reference number if record request created
+                  successfully
+        :rtype: str
+        """
+
+        jsonschema.validate(required_inputs, self.schema)
+
+        payload = self._build_payload(required_inputs)
+
+        response = self._session.post(self.request_url, data=payload)
+
+        tree = lxml.html.fromstring(response.text)
+
+        try:
+            reference_number = tree.xpath(
+                './/span[@id="ConfirmFormLayout_roReferenceNo"]'
+            )[0].text
+            return reference_number
+        except IndexError:
+            form_validation_errors = tree.xpath(
+                '//div[@id="header_errors1"]//li/text()'
+            )
+
+            if not len(form_validation_errors):
+                raise FormValidationError(
+                    "The form did not validate for an unknown reason."
+                )
+
+            self._reset_captcha(tree)
+
+            if "The submitted CAPTCHA code is incorrect" in form_validation_errors:
+                raise IncorrectCaptcha("The submitted captcha was incorrect")
+
+            for error in form_validation_errors:
+                raise FormValidationError(
+                    f'The form did not validate. The website reports this error: "{error}"'
+                )
@@ -0,0 +1,64 @@
+import html
+import re
+
+_INPUT_PATTERN = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+_ATTRIBUTE_PATTERN = re.compile(
+    r"""\b(name|value)\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE
+)
+_FIELD_NAMES = re.compile(
+    r"^__(VIEWSTATE\d*|VIEWSTATEFIELDCOUNT|VIEWSTATEGENERATOR|RequestVerificationToken)$"
+)
+
+
+class PostbackState:
+    """
+    The hidden ASP.NET fields (``__VIEWSTATE*``, ``__VIEWSTATEGENERATOR``
+    and ``__RequestVerificationToken``) that a page expects to be posted
+    back to it.
+
+    The client keeps one of these per page and refreshes it from every
+    response it receives, so a form can be resubmitted, or a login retried,
+    without fetching the page again.
+
+    :param url: URL of the page the fields belong to
+    :type url: str
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.fields = {}
+
+    def __bool__(self):
+        return "__VIEWSTATE" in self.fields
+
+    def payload(self):
+        """
+        :returns: the fields to include in a postback to the page
+        :rtype: dict
+        """
+        payload = {
+            "__EVENTTARGET": "",
+            "__EVENTARGUMENT": "",
+            "__VIEWSTATEENCRYPTED": "",
+        }
+        payload.update(self.fields)
+        return payload
+
+    @staticmethod
+    def parse(text):
+        # a full lxml parse is wasted on the handful of hidden inputs we
+        # need, and this runs on every response the client receives
+        fields = {}
+        if "__VIEWSTATE" not in text:
+            return fields
+
+        for element in _INPUT_PATTERN.findall(text):
+            attributes = {
+                key.lower(): double or single
+                for key, double, single in _ATTRIBUTE_PATTERN.findall(element)
+            }
+            name = attributes.get("name", "")
+            if _FIELD_NAMES.match(name):
+                fields[name] = html.unescape(attributes.get("value", ""))
+
+        return fields
@@ -0,0 +1,152 @@
+import concurrent.futures
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+
+from .base import USER_AGENT, GovQA
+from .transport import Transport
+
+_REQUEST_TYPE_PATTERN = re.compile(r"RequestOpen\.aspx\?rqst=(\d+)", re.IGNORECASE)
+
+
+class ProbeStore:
+    """
+    Results of earlier domain probes, kept in memory and optionally saved to
+    a JSON file.
+
+    :param path: JSON file to load results from and save them to
+    :type path: str
+    :param max_age: Seconds after which a result is stale and the domain is
+                    checked again. By default, results never go stale.
+    :type max_age: float
+    :param error_max_age: Seconds after which an "error" result, e.g., a
+                          timeout or DNS failure, is stale. By default, error
+                          results are never reused, since the failure may
+                          have been temporary.
+    :type error_max_age: float
+    """
+
+    def __init__(self, path=None, max_age=None, error_max_age=0):
+        self.path = path
+        self.max_age = max_age
+        self.error_max_age = error_max_age
+        self._lock = threading.Lock()
+        self._results = {}
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self._results = json.load(f)
+
+    def get(self, domain):
+        with self._lock:
+            result = self._results.get(domain)
+
+        if result is None:
+            return None
+
+        if result["status"] == "error":
+            max_age = self.error_max_age
+        else:
+            max_age = self.max_age
+
+        age = time.time() - result["checked_at"]
+        if max_age is not None and age >= max_age:
+            return None
+
+        return result
+
+    def add(self, result):
+        with self._lock:
+            self._results[result["domain"]] = result
+
+    def save(self):
+        if not self.path:
+            return
+
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._results, f)
+            os.replace(tmp_path, self.path)
+
+
+def _normalize(domain):
+    domain = domain.strip().rstrip("/")
+    if "://" not in domain:
+        domain = f"https://{domain}"
+    return domain
+
+
+def probe(session, domain, timeout):
+    result = {
+        "domain": domain,
+        "status": "error",
+        "url": None,
+        "request_types": [],
+        "error": None,
+        "checked_at": time.time(),
+    }
+
+    try:
+        response = session.get(
+            f"{domain}/WEBAPP/_rs/", timeout=timeout, allow_redirects=True
+        )
+    except requests.RequestException as error:
+        result["error"] = str(error)
+        return result
+
+    result["url"] = response.url
+
+    if not GovQA._is_supported(response):
+        result["status"] = "unsupported"
+        return result
+
+    result["status"] = "supported"
+    result["request_types"] = sorted(
+        {int(rqst) for rqst in _REQUEST_TYPE_PATTERN.findall(response.text)}
+    )
+
+    return result
+
+
+def probe_many(domains, max_workers=16, timeout=10, store=None):
+    results = {}
+    to_probe = []
+
+    for domain in domains:
+        domain = _normalize(domain)
+        cached = store.get(domain) if store is not None else None
+        if cached is not None:
+            results[domain] = cached
+        elif domain not in results:
+            results[domain] = None
+            to_probe.append(domain)
+
+    # a plain session is enough here; each domain is only requested once, so
+    # there is no need to throttle, and no GovQA state to track
+    with requests.Session() as session:
+        session.headers["User-Agent"] = USER_AGENT
+        Transport(pool_connections=max_workers, pool_maxsize=1).mount(session)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers)
+        try:
+            futures = [
+                executor.submit(probe, session, domain, timeout) for domain in to_probe
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                results[result["domain"]] = result
+                if store is not None:
+                    store.add(result)
+        finally:
+            # if the run is interrupted, don't wait on the domains that are
+            # left, and keep the results that are already in
+            executor.shutdown(cancel_futures=True)
+            if store is not None:
+                store.save()
+
+    return results
@@ -0,0 +1,149 @@
+import hashlib
+import sqlite3
+import threading
+
+from .attachments import attachment_filename
+
+
+class SearchIndex:
+    """
+    Local full-text index of request correspondence and attachment names,
+    built on SQLite's FTS5 extension.
+
+    The index is updated from the results of :meth:`govqa.GovQA.get_request`,
+    and only messages and attachments that are new or have changed are
+    (re)indexed.
+
+    :param path: SQLite file to keep the index in
+    :type path: str
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5 (
+                    request_id UNINDEXED,
+                    kind UNINDEXED,
+                    item_id UNINDEXED,
+                    text,
+                    tokenize = 'porter unicode61'
+                );
+                CREATE TABLE IF NOT EXISTS items (
+                    request_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    document INTEGER NOT NULL,
+                    PRIMARY KEY (request_id, kind, item_id)
+                );
+                """)
+
+    def update(self, request):
+        """
+        Index a request's messages and attachment names.
+
+        :param request: a request dictionary returned by
+                        :meth:`govqa.GovQA.get_request`
+        :type request: dict
+        :return: number of messages and attachments that were added or
+                 changed
+        :rtype: int
+        """
+        request_id = str(request["id"])
+
+        items = {}
+        for message in request["messages"]:
+            text = f"{message['sender']}\n{message['body']}"
+            items[("message", message["id"])] = text
+        for attachment in request["attachments"]:
+            filename = attachment_filename(attachment)
+            items[("attachment", filename)] = filename
+
+        updated = 0
+
+        with self._lock, self._db:
+            indexed = {
+                (kind, item_id): (digest, document)
+                for kind, item_id, digest, document in self._db.execute(
+                    "SELECT kind, item_id, digest, document FROM items "
+                    "WHERE request_id = ?",
+                    (request_id,),
+                )
+            }
+
+            for key in indexed.keys() - items.keys():
+                self._remove(request_id, key, indexed[key][1])
+
+            for (kind, item_id), text in items.items():
+                digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+                if (kind, item_id) in indexed:
+                    indexed_digest, document = indexed[(kind, item_id)]
+                    if indexed_digest == digest:
+                        continue
+                    self._remove(request_id, (kind, item_id), document)
+
+                cursor = self._db.execute(
+                    "INSERT INTO documents (request_id, kind, item_id, text) "
+                    "VALUES (?, ?, ?, ?)",
+                    (request_id, kind, item_id, text),
+                )
+                self._db.execute(
+                    "INSERT INTO items "
+                    "(request_id, kind, item_id, digest, document) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (request_id, kind, item_id, digest, cursor.lastrowid),
+                )
+                updated += 1
+
+        return updated
+
+    def search(self, query, limit=20):
+        """
+        Search indexed messages and attachment names.
+
+        :param query: an `FTS5 query <https://www.sqlite.org/fts5.html>`_,
+                      e.g., ``"exemption AND fee"``
+        :type query: str
+        :param limit: maximum number of results
+        :type limit: int
+        :return: List of dictionaries, best matches first, each containing
+                 the request id, the message id or attachment filename,
+                 and a snippet of the matching text.
+        :rtype: list
+        """
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT request_id, kind, item_id,
+                       snippet(documents, 3, '[', ']', '...', 12)
+                FROM documents
+                WHERE documents MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (query, limit),
+            ).fetchall()
+
+        return [
+            {
+                "request_id": request_id,
+                "message_id": item_id if kind == "message" else None,
+                "attachment": item_id if kind == "attachment" else None,
+                "snippet": snippet,
+            }
+            for request_id, kind, item_id, snippet in rows
+        ]
+
+    def close(self):
+        self._db.close()
+
+    def _remove(self, request_id, key, document):
+        kind, item_id = key
+        self._db.execute("DELETE FROM documents WHERE rowid = ?", (document,))
+        self._db.execute(
+            "DELETE FROM items WHERE request_id = ? AND kind = ? AND item_id = ?",
+            (request_id, kind, item_id),
+        )
@@ -0,0 +1,445 @@
+import contextlib
+import functools
+import http.client
+import io
+import os
+import ssl
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import (
+    DEFAULT_CA_BUNDLE_PATH,
+    get_auth_from_url,
+    get_encoding_from_headers,
+    select_proxy,
+)
+from urllib3._collections import HTTPHeaderDict
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from urllib3.response import HTTPResponse
+
+
+class Transport:
+    """
+    Connection settings for a :class:`govqa.GovQA` client.
+
+    :param pool_maxsize: Number of connections to keep open to each host.
+                         Set this to at least the number of threads sharing
+                         the client.
+    :type pool_maxsize: int
+    :param pool_connections: Number of hosts to keep connection pools for.
+    :type pool_connections: int
+    :param pool_block: If True, a caller that finds every connection to a host
+                       in use waits for one to be freed, rather than opening
+                       an extra connection that is thrown away afterwards.
+    :type pool_block: bool
+    :param pool_timeout: Seconds to wait for a free connection before giving
+                         up with a ConnectionError, or None to wait
+                         indefinitely.
+    :type pool_timeout: float
+    :param keep_alive: Reuse connections between requests.
+    :type keep_alive: bool
+    :param keep_alive_expiry: Seconds an idle connection is kept open. Only
+                              used by the HTTP/2 backend; the default backend
+                              relies on the server closing idle connections.
+    :type keep_alive_expiry: float
+    :param timeout: Default timeout for requests, in seconds, or as a
+                    (connect, read) tuple.
+    :type timeout: float or tuple
+    :param http2: Use an HTTP/2 capable backend. Requires the ``http2`` extra,
+                  i.e., ``pip install govqa[http2]``.
+    :type http2: bool
+    """
+
+    def __init__(
+        self,
+        pool_maxsize=10,
+        pool_connections=10,
+        pool_block=True,
+        pool_timeout=30.0,
+        keep_alive=True,
+        keep_alive_expiry=5.0,
+        timeout=None,
+        http2=False,
+    ):
+        self.pool_maxsize = pool_maxsize
+        self.pool_connections = pool_connections
+        self.pool_block = pool_block
+        self.pool_timeout = pool_timeout
+        self.keep_alive = keep_alive
+        self.keep_alive_expiry = keep_alive_expiry
+        self.timeout = timeout
+        self.http2 = http2
+
+    def adapter(self):
+        if self.http2:
+            return HTTP2Adapter(
+                max_connections=self.pool_connections * self.pool_maxsize,
+                max_keepalive_connections=(
+                    self.pool_connections * self.pool_maxsize if self.keep_alive else 0
+                ),
+                keep_alive_expiry=self.keep_alive_expiry,
+                pool_timeout=self.pool_timeout,
+            )
+
+        return PoolTimeoutAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            pool_timeout=self.pool_timeout,
+        )
+
+    def mount(self, session):
+        """
+        Configure a session to use these settings.
+
+        :param session: the session to configure
+        :type session: requests.Session
+        """
+        adapter = self.adapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+
+        if self.timeout is not None:
+            session.timeout = self.timeout
+
+
+class PoolTimeoutAdapter(HTTPAdapter):
+    """
+    requests' HTTPAdapter, but a request that finds every connection in a
+    blocking pool in use waits at most pool_timeout seconds for one, rather
+    than indefinitely.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_timeout"]
+
+    def __init__(self, *args, pool_timeout=None, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._set_pool_classes(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._set_pool_classes(manager)
+        return manager
+
+    def send(self, request, *args, **kwargs):
+        try:
+            return super().send(request, *args, **kwargs)
+        except EmptyPoolError as error:
+            raise requests.ConnectionError(error, request=request)
+
+    def _set_pool_classes(self, manager):
+        manager.pool_classes_by_scheme = {
+            "http": functools.partial(
+                _HTTPConnectionPool, pool_timeout=self.pool_timeout
+            ),
+            "https": functools.partial(
+                _HTTPSConnectionPool, pool_timeout=self.pool_timeout
+            ),
+        }
+
+
+class _PoolTimeoutMixin:
+    def __init__(self, *args, pool_timeout=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool_timeout = pool_timeout
+
+    def _get_conn(self, timeout=None):
+        if timeout is None:
+            timeout = self.pool_timeout
+        return super()._get_conn(timeout=timeout)
+
+
+class _HTTPConnectionPool(_PoolTimeoutMixin, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSConnectionPool(_PoolTimeoutMixin, HTTPSConnectionPool):
+    pass
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    A requests adapter that sends requests through `httpcore
+    <https://www.encode.io/httpcore/>`_ connection pools, which can speak
+    HTTP/2 and multiplex concurrent requests to a host over a single
+    connection.
+
+    httpcore keeps no cookies of its own, so cookies stay with the requests
+    session that sent them, even when sessions share the adapter.
+    """
+
+    def __init__(
+        self,
+        max_connections=100,
+        max_keepalive_connections=20,
+        keep_alive_expiry=5.0,
+        pool_timeout=None,
+    ):
+        super().__init__()
+
+        try:
+            import httpcore
+        except ImportError:
+            raise ImportError(
+                "The HTTP/2 transport requires httpcore, install it with `pip install govqa[http2]`"
+            )
+
+        self._httpcore = httpcore
+        self._limits = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keep_alive_expiry,
+        }
+        self._pool_timeout = pool_timeout
+        self._lock = threading.Lock()
+        self._pools = {}
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        timeouts = {
+            "connect": connect,
+            "read": read,
+            "write": read,
+            "pool": self._pool_timeout,
+        }
+
+        headers = list(request.headers.items())
+        if "Host" not in request.headers:
+            headers.insert(0, ("Host", urlparse(request.url).netloc.rsplit("@", 1)[-1]))
+
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        pool = self._pool(verify, cert, select_proxy(request.url, proxies))
+
+        with self._map_errors(request):
+            response = pool.handle_request(
+                self._httpcore.Request(
+                    request.method,
+                    request.url,
+                    headers=headers,
+                    content=body,
+                    extensions={"timeout": timeouts},
+                )
+            )
+
+        status = response.status
+        reason = response.extensions.get("reason_phrase", b"").decode("ascii")
+        response_headers = [
+            (key.decode("latin-1"), value.decode("latin-1"))
+            for key, value in response.headers
+        ]
+
+        # hand the body to urllib3, as requests' own adapter does, so that it
+        # is decompressed according to its Content-Encoding, and only read
+        # from the connection as the caller reads it
+        raw_headers = HTTPHeaderDict()
+        for key, value in response_headers:
+            raw_headers.add(key, value)
+
+        body = _ResponseStream(self, request, response)
+        raw = HTTPResponse(
+            body=body,
+            headers=raw_headers,
+            status=status,
+            reason=reason,
+            preload_content=False,
+            decode_content=False,
+            original_response=_RawResponse(response_headers, body),
+            request_method=request.method,
+            request_url=request.url,
+        )
+
+        result = requests.Response()
+        result.status_code = status
+        result.reason = reason or http.client.responses.get(status, "")
+        result.headers = CaseInsensitiveDict(raw.headers)
+        result.encoding = get_encoding_from_headers(result.headers)
+        result.url = request.url
+        result.request = request
+        result.raw = raw
+        result.connection = self
+
+        return result
+
+    @contextlib.contextmanager
+    def _map_errors(self, request):
+        try:
+            yield
+        except self._httpcore.PoolTimeout as error:
+            raise requests.ConnectionError(error, request=request)
+        except self._httpcore.TimeoutException as error:
+            raise requests.Timeout(error, request=request)
+        except self._httpcore.ProxyError as error:
+            raise requests.exceptions.ProxyError(error, request=request)
+        except (self._httpcore.NetworkError, self._httpcore.ProtocolError) as error:
+            raise requests.ConnectionError(error, request=request)
+
+    def close(self):
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+    def _pool(self, verify, cert, proxy):
+        if isinstance(cert, list):
+            cert = tuple(cert)
+
+        key = (verify, cert, proxy)
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = self._new_pool(verify, cert, proxy)
+            return self._pools[key]
+
+    def _new_pool(self, verify, cert, proxy):
+        ssl_context = _ssl_context(verify, cert)
+
+        if proxy is None:
+            return self._httpcore.ConnectionPool(
+                ssl_context=ssl_context, http2=True, **self._limits
+            )
+
+        proxy_url = urlparse(proxy)
+        if proxy_url.scheme not in ("http", "https"):
+            raise requests.exceptions.InvalidSchema(
+                f"The HTTP/2 transport only supports HTTP(S) proxies, not {proxy}"
+            )
+
+        username, password = get_auth_from_url(proxy)
+        return self._httpcore.HTTPProxy(
+            proxy_url=proxy_url._replace(
+                netloc=proxy_url.netloc.rsplit("@", 1)[-1]
+            ).geturl(),
+            proxy_auth=(username, password) if username else None,
+            ssl_context=ssl_context,
+            http2=True,
+            **self._limits,
+        )
+
+
+def _ssl_context(verify, cert):
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str) and os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    elif isinstance(verify, str):
+        context = ssl.create_default_context(cafile=verify)
+    else:
+        context = ssl.create_default_context(cafile=DEFAULT_CA_BUNDLE_PATH)
+
+    if isinstance(cert, str):
+        context.load_cert_chain(cert)
+    elif cert:
+        context.load_cert_chain(*cert)
+
+    return context
+
+
+class _ResponseStream(io.RawIOBase):
+    """
+    File-like view of an httpcore response's body, which returns the
+    connection to the pool once the body is read or the response is closed.
+    """
+
+    def __init__(self, adapter, request, response):
+        self._adapter = adapter
+        self._request = request
+        self._response = response
+        self._chunks = iter(response.stream)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._buffer and not self.closed:
+            with self._adapter._map_errors(self._request):
+                self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b""
+                self.close()
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._response.close()
+        super().close()
+
+
+def build_response(request, status_code, reason, headers, content):
+    """
+    Build a requests response from an already-read and decoded body, e.g.,
+    one replayed from a cassette.
+
+    :param headers: (name, value) pairs, with repeated headers, such as
+                    Set-Cookie, listed once per value
+    :type headers: list
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.url = request.url
+    response.request = request
+
+    # the body has already been decoded, so the content-encoding no longer
+    # applies
+    headers = [
+        (key, value) for key, value in headers if key.lower() != "content-encoding"
+    ]
+    response.headers = CaseInsensitiveDict()
+    for key, value in headers:
+        if key in response.headers:
+            response.headers[key] += f", {value}"
+        else:
+            response.headers[key] = value
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    response._content_consumed = True
+
+    # requests reads cookies off the raw http.client response, so give it
+    # something that looks like one
+    response.raw = _RawResponse(headers)
+
+    return response
+
+
+class _RawResponse:
+    def __init__(self, headers, body=None):
+        self.msg = http.client.HTTPMessage()
+        for key, value in headers:
+            self.msg[key] = value
+        self._original_response = self
+        self._body = body
+
+    def release_conn(self):
+        pass
+
+    def isclosed(self):
+        return self._body is None or self._body.closed
+
+    def close(self):
+        if self._body is not None:
+            self._body.close()
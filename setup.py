@@ -17,6 +17,7 @@ setup(
         "python-dateutil",
     ],
     extras_require={
+        "http2": ["httpcore[http2]"],
         "dev": ["sphinx", "pytest", "requests-mock", "black", "isort"],
     },
     classifiers=[
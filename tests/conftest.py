@@ -0,0 +1,41 @@
+import pytest
+import requests_mock
+
+from govqa import GovQA
+
+DOMAIN = "https://example.govqa.us"
+
+
+def url(endpoint):
+    return f"{DOMAIN}/WEBAPP/_rs/{endpoint}"
+
+
+def page(body="", viewstate=None, user=""):
+    hidden = ""
+    if viewstate is not None:
+        hidden = (
+            f'<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{viewstate}" />'
+            '<input type="hidden" name="__VIEWSTATEGENERATOR" id="__VIEWSTATEGENERATOR" value="GEN" />'
+            '<input name="__RequestVerificationToken" type="hidden" value="TOKEN" />'
+        )
+    return (
+        f'<html><head><script>dtrum.identifyUser("id;{user}");</script></head>'
+        f"<body><form>{hidden}{body}</form></body></html>"
+    )
+
+
+@pytest.fixture
+def mock():
+    with requests_mock.Mocker() as m:
+        m.get(
+            url(""),
+            status_code=302,
+            headers={"Location": url("SupportHome.aspx")},
+        )
+        m.get(url("SupportHome.aspx"), text=page())
+        yield m
+
+
+@pytest.fixture
+def client(mock):
+    return GovQA(DOMAIN, requests_per_minute=0)
@@ -0,0 +1,87 @@
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+import lxml.html
+import pytest
+
+from govqa import AccountPool, ParseCache
+
+from .conftest import page, url
+
+REQUEST_LIST = """
+<div class="innerlist">
+  <a id="referenceLnk_0" href="RequestEdit.aspx?rid={rid}">R00000{rid}</a>
+  <div class="list_status">Open</div>
+</div>
+"""
+
+
+def current_user(request):
+    cookies = SimpleCookie(request.headers.get("Cookie", ""))
+    return cookies["user"].value if "user" in cookies else ""
+
+
+@pytest.fixture
+def accounts(mock):
+    def login(request, context):
+        (username,) = parse_qs(request.text)["ASPxFormLayout1$txtUsername"]
+        return page(user=username)
+
+    def request_list(request, context):
+        user = current_user(request)
+        if user == "broken":
+            context.status_code = 500
+            return ""
+        rid = {"alice": 1, "bob": 2}[user]
+        return page(REQUEST_LIST.format(rid=rid), user=user)
+
+    mock.get(url("Login.aspx"), text=page(viewstate="login"))
+    mock.post(url("Login.aspx"), text=login)
+    mock.get(url("CustomerIssues.aspx"), text=request_list)
+
+
+def log_in(client, username):
+    client.login(username, "password")
+    # requests_mock doesn't put the cookies it sets in the session's jar
+    client.cookies.set("user", username)
+
+
+def test_parse_cache_is_per_account(client, accounts, monkeypatch):
+    client.parse_cache = ParseCache()
+    client.retry_attempts = 0
+
+    alice = client.fork()
+    log_in(alice, "alice")
+    bob = client.fork()
+    log_in(bob, "bob")
+
+    parsed = []
+    lxml_fromstring = lxml.html.fromstring
+
+    def fromstring(text, *args, **kwargs):
+        parsed.append(text)
+        return lxml_fromstring(text, *args, **kwargs)
+
+    monkeypatch.setattr(lxml.html, "fromstring", fromstring)
+
+    for _ in range(2):
+        assert alice.list_requests()[0]["id"] == "1"
+        assert bob.list_requests()[0]["id"] == "2"
+
+    # each account's page is parsed once, and not again after the other's
+    assert len(parsed) == 2
+
+
+def test_pool_reports_errors_per_account(client, accounts):
+    client.retry_attempts = 0
+
+    pool = AccountPool(client, max_workers=2)
+    assert pool.login({"alice": "a", "bob": "b", "broken": "c"}) == {}
+    for username, account in pool.clients.items():
+        account.cookies.set("user", username)
+
+    requests, errors = pool.list_requests()
+
+    assert requests["alice"][0]["id"] == "1"
+    assert requests["bob"][0]["id"] == "2"
+    assert list(errors) == ["broken"]
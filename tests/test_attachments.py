@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+from govqa.attachments import AttachmentStore, attachment_filename
+
+ATTACHMENT_URL = "https://files.example.com/abc/report.pdf?sig=1"
+
+
+@pytest.mark.parametrize(
+    "content_disposition,filename",
+    [
+        ('attachment; filename="a; b.pdf"', "a; b.pdf"),
+        ("attachment; filename*=UTF-8''r%C3%A9sum%C3%A9.pdf", "résumé.pdf"),
+        ("inline; filename=plain.pdf", "plain.pdf"),
+        (None, "report.pdf"),
+    ],
+)
+def test_attachment_filename(content_disposition, filename):
+    attachment = {"url": ATTACHMENT_URL, "content-disposition": content_disposition}
+    assert attachment_filename(attachment) == filename
+
+
+def attachment(uploaded_at):
+    return {
+        "url": ATTACHMENT_URL,
+        "content-disposition": 'attachment; filename="report.pdf"',
+        "uploaded_at": uploaded_at,
+    }
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_fetch_reuses_link_for_same_upload(tmp_path, client, mock):
+    download = mock.get(ATTACHMENT_URL, content=b"first")
+    store = AttachmentStore(str(tmp_path))
+
+    path = store.fetch(client, 1, attachment(datetime.date(2024, 1, 2)))
+    assert store.fetch(client, 1, attachment(datetime.date(2024, 1, 2))) == path
+
+    assert read(path) == b"first"
+    assert download.call_count == 1
+
+
+def test_fetch_replaced_attachment(tmp_path, client, mock):
+    store = AttachmentStore(str(tmp_path))
+
+    mock.get(ATTACHMENT_URL, content=b"first")
+    store.fetch(client, 1, attachment(datetime.date(2024, 1, 2)))
+
+    mock.get(ATTACHMENT_URL, content=b"second")
+    path = store.fetch(client, 1, attachment(datetime.date(2024, 3, 4)))
+
+    assert read(path) == b"second"
+    assert store.get(1, "report.pdf") == path
@@ -0,0 +1,120 @@
+import datetime
+
+import lxml.html
+import pytest
+
+from govqa import ParseCache
+from govqa.cache import page_digest
+
+from .conftest import DOMAIN, page, url
+
+REQUEST = """
+<span id="RequestEditFormLayout_roType">Public Records Request</span>
+<span id="RequestEditFormLayout_roContactEmail">someone@example.com</span>
+<span id="RequestEditFormLayout_roReferenceNo">R000001-010124</span>
+<div id="dvAttachments">
+  <table>{attachments}</table>
+</div>
+"""
+
+ATTACHMENT = """
+<tr>
+  <td>1/2/2024</td>
+  <td><div class="qac_attachment">
+    <input type="hidden" id="rptAttachments_hdnAWSUrl_{index}" value="{url}" />
+  </div></td>
+</tr>
+"""
+
+
+def signed_url(filename, expires, signature):
+    return (
+        f"https://bucket.s3.amazonaws.com/{filename}"
+        f"?response-content-disposition=attachment%3B%20filename%3D%22{filename}%22"
+        f"&amp;Expires={expires}&amp;Signature={signature}"
+    )
+
+
+def request_page(viewstate, expires, signature, filenames=("letter.pdf",)):
+    attachments = "".join(
+        ATTACHMENT.format(index=index, url=signed_url(filename, expires, signature))
+        for index, filename in enumerate(filenames)
+    )
+    return page(
+        REQUEST.format(attachments=attachments), viewstate=viewstate, user="someone"
+    )
+
+
+@pytest.fixture
+def parsed(monkeypatch):
+    calls = []
+    fromstring = lxml.html.fromstring
+
+    def counting_fromstring(text, *args, **kwargs):
+        calls.append(text)
+        return fromstring(text, *args, **kwargs)
+
+    monkeypatch.setattr(lxml.html, "fromstring", counting_fromstring)
+    return calls
+
+
+def test_page_digest_ignores_viewstate_and_signed_urls():
+    first = request_page("state1", 1700000000, "abc")
+    second = request_page("state2", 1800000000, "def")
+
+    assert page_digest(first) == page_digest(second)
+    assert page_digest(first) != page_digest(first.replace("1/2/2024", "1/3/2024"))
+
+
+def test_unchanged_page_is_not_parsed_again(client, mock, parsed):
+    client.parse_cache = ParseCache()
+    mock.get(
+        url("RequestEdit.aspx?rid=1"),
+        [
+            {"text": request_page("state1", 1700000000, "abc")},
+            {"text": request_page("state2", 1800000000, "def")},
+        ],
+    )
+
+    first = client.get_request(1)
+    assert len(parsed) == 1
+
+    second = client.get_request(1)
+    assert len(parsed) == 1
+
+    (attachment,) = second["attachments"]
+    assert "Signature=def" in attachment["url"]
+    assert "&amp;" not in attachment["url"]
+    assert attachment["expires"] == datetime.datetime.fromtimestamp(1800000000)
+    assert attachment["uploaded_at"] == first["attachments"][0]["uploaded_at"]
+    assert second["reference_number"] == "R000001-010124"
+
+
+def test_attachment_count_mismatch_parses_page(client, mock, parsed):
+    client.parse_cache = ParseCache()
+    text = request_page("state1", 1700000000, "abc", ["a.pdf", "b.pdf"])
+    mock.get(url("RequestEdit.aspx?rid=1"), text=text)
+
+    # a cached result for the same page, but with one attachment too few
+    client.parse_cache.set(
+        f"{DOMAIN} {client.username} get_request 1",
+        page_digest(text),
+        {"id": 1, "messages": [], "attachments": [{"url": "stale"}]},
+    )
+
+    request = client.get_request(1)
+
+    assert len(parsed) == 1
+    assert len(request["attachments"]) == 2
+    assert all("Signature=abc" in a["url"] for a in request["attachments"])
+
+
+def test_parse_cache_persists(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    result = {"id": 1, "uploaded_at": datetime.date(2024, 1, 2)}
+
+    ParseCache(path=path).set("key", "digest", result)
+
+    cache = ParseCache(path=path)
+    assert cache.get("key", "digest") == result
+    assert cache.get("key", "other digest") is None
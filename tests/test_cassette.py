@@ -0,0 +1,43 @@
+import pytest
+import requests_mock
+
+from govqa import Cassette, GovQA, Transport
+
+from .conftest import DOMAIN, page, url
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    # mounted as the transport, so that the cassette records through it
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        "GET", url(""), status_code=302, headers={"Location": url("SupportHome.aspx")}
+    )
+    adapter.register_uri("GET", url("SupportHome.aspx"), text=page())
+    monkeypatch.setattr(Transport, "adapter", lambda self: adapter)
+    return adapter
+
+
+def record(path, adapter, body, **kwargs):
+    adapter.register_uri("GET", url("Login.aspx"), text=page(body))
+    client = GovQA(
+        DOMAIN, requests_per_minute=0, cassette=Cassette(path, "record", **kwargs)
+    )
+    client.get(url("Login.aspx"))
+
+
+def test_record_refuses_to_overwrite(tmp_path, adapter):
+    path = tmp_path / "cassette.jsonl.gz"
+    record(path, adapter, "first")
+
+    with pytest.raises(FileExistsError):
+        record(path, adapter, "second")
+
+
+def test_rerecording_replaces_earlier_run(tmp_path, adapter):
+    path = tmp_path / "cassette.jsonl.gz"
+    record(path, adapter, "first")
+    record(path, adapter, "second", overwrite=True)
+
+    client = GovQA(DOMAIN, cassette=Cassette(path))
+    assert "second" in client.get(url("Login.aspx")).text
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+# cumulative time, in microseconds, that `import govqa` may take, including
+# importing its dependencies
+IMPORT_BUDGET_US = 500_000
+
+# sqlite3 isn't listed, because scrapelib imports it anyway
+LAZY_MODULES = {
+    "jsonschema",
+    "concurrent.futures",
+    "govqa.accounts",
+    "govqa.attachments",
+    "govqa.cache",
+    "govqa.cassette",
+    "govqa.forms",
+    "govqa.input_types",
+    "govqa.probe",
+    "govqa.search",
+}
+
+
+def import_times():
+    # import once first, so the measured run isn't paying to compile .pyc files
+    subprocess.run([sys.executable, "-c", "import govqa"], check=True)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import govqa"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_skips_lazy_modules():
+    loaded = set(import_times())
+    assert not loaded & LAZY_MODULES
+
+
+def test_import_within_budget():
+    assert import_times()["govqa"] < IMPORT_BUDGET_US
@@ -0,0 +1,123 @@
+import http.server
+import threading
+
+import pytest
+import scrapelib
+
+from govqa import GovQA, Transport
+
+from .conftest import page, url
+
+MESSAGE = """
+<table id="rptMessageHistory_{id}">
+  <tr><td><span class="dxrpHT"> On 1/2/2024 3:04:05 PM, Someone wrote:</span></td></tr>
+  <tr><td><div class="dxrpCW">Message {id}</div></td></tr>
+</table>
+"""
+
+TRUNCATED_MESSAGE = """
+<table id="rptMessageHistory_{id}">
+  <tr><td><span class="dxrpHT"> On 1/2/2024 3:04:05 PM, Someone wrote:</span></td></tr>
+  <tr><td><div class="dxrpCW">Message {id}...
+    <a onclick="showMessage('MessageDetail.aspx?id={id}')">Click Here to View Entire Message</a>
+  </div></td></tr>
+</table>
+"""
+
+
+def test_iter_messages(client, mock):
+    mock.get(
+        url("RequestEdit.aspx?rid=1"),
+        text=page(MESSAGE.format(id=1) + MESSAGE.format(id=2), user="someone"),
+    )
+
+    messages = list(client.iter_messages(1))
+
+    assert [message["id"] for message in messages] == ["1", "2"]
+    assert messages[1]["body"] == "Message 2"
+
+
+@pytest.mark.parametrize(
+    "marker,status_code",
+    [
+        ("There was a problem serving the requested page", 500),
+        ("Page Temporarily Unavailable", 503),
+    ],
+)
+@pytest.mark.parametrize("padding", [0, 64 * 1024 - 10])
+def test_iter_messages_raises_for_error_page(
+    client, mock, marker, status_code, padding
+):
+    # the padding splits the marker across the chunks the parser reads
+    mock.get(
+        url("RequestEdit.aspx?rid=1"),
+        text=f"<html><body><!-- {'x' * padding} --><h1>{marker}</h1></body></html>",
+    )
+
+    with pytest.raises(scrapelib.HTTPError) as error:
+        list(client.iter_messages(1))
+
+    assert error.value.response.status_code == status_code
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/WEBAPP/_rs/":
+            self.send_response(302)
+            self.send_header("Location", "/WEBAPP/_rs/SupportHome.aspx")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.path.startswith("/WEBAPP/_rs/RequestEdit.aspx"):
+            # enough padding that the page is still being read when the
+            # truncated message is reached
+            body = page(
+                TRUNCATED_MESSAGE.format(id=1)
+                + f"<!-- {'x' * 256 * 1024} -->"
+                + MESSAGE.format(id=2),
+                user="someone",
+            )
+        elif self.path.startswith("/WEBAPP/_rs/MessageDetail.aspx"):
+            body = (
+                '<html><body><div id="divMessage">All of message 1</div></body></html>'
+            )
+        else:
+            body = page()
+
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_iter_messages_with_one_connection(server):
+    # with the page's connection held while the truncated message is
+    # fetched, this would run out the pool and time out
+    client = GovQA(
+        server,
+        transport=Transport(pool_maxsize=1, pool_connections=1, pool_timeout=5),
+        requests_per_minute=0,
+        retry_attempts=0,
+    )
+
+    messages = list(client.iter_messages(1))
+
+    assert [message["body"] for message in messages] == [
+        "All of message 1",
+        "Message 2",
+    ]
@@ -0,0 +1,118 @@
+from urllib.parse import parse_qs
+
+import pytest
+
+from govqa import IncorrectCaptcha, UnauthenticatedError
+
+from .conftest import DOMAIN, page, url
+
+
+def posted(request):
+    return {key: values[0] for key, values in parse_qs(request.text).items()}
+
+
+def test_relogin_fetches_fresh_login_state(client, mock):
+    mock.get(url("Login.aspx"), text=page(viewstate="login"))
+    mock.post(
+        url("Login.aspx"),
+        status_code=302,
+        headers={"Location": url("CustomerHome.aspx")},
+    )
+    mock.get(url("CustomerHome.aspx"), text=page(viewstate="home", user="someone"))
+
+    client.login("someone", "password")
+    client.login("someone", "password")
+
+    methods = [
+        (request.method, request.url)
+        for request in mock.request_history
+        if "login.aspx" in request.url.lower()
+    ]
+    assert methods == [
+        ("GET", url("Login.aspx")),
+        ("POST", url("Login.aspx")),
+        ("GET", url("Login.aspx")),
+        ("POST", url("Login.aspx")),
+    ]
+    assert posted(mock.request_history[-2])["__VIEWSTATE"] == "login"
+
+
+def test_failed_login_reuses_returned_state(client, mock):
+    mock.get(url("Login.aspx"), text=page(viewstate="first"))
+    mock.post(url("Login.aspx"), text=page(viewstate="second"))
+
+    for _ in range(2):
+        with pytest.raises(UnauthenticatedError):
+            client.login("someone", "wrong")
+
+    login_requests = [
+        request
+        for request in mock.request_history
+        if "login.aspx" in request.url.lower()
+    ]
+    assert [request.method for request in login_requests] == ["GET", "POST", "POST"]
+    assert posted(login_requests[1])["__VIEWSTATE"] == "first"
+    assert posted(login_requests[2])["__VIEWSTATE"] == "second"
+
+
+REQUEST_FORM = """
+<table>
+  <tr><td><label for="requestDescription">Description:</label><em>*</em></td></tr>
+  <tr><td><input type="text" name="request$description" /></td></tr>
+</table>
+<img id="c_requestopen_captchaformlayout_reqstopencaptcha_CaptchaImage"
+     src="/captcha.jpg" />
+<input type="hidden"
+       name="BDC_VCID_c_requestopen_captchaformlayout_reqstopencaptcha"
+       value="{captcha_hash}" />
+"""
+
+CAPTCHA_ERROR = """
+<div id="header_errors1"><ul><li>The submitted CAPTCHA code is incorrect</li></ul></div>
+"""
+
+
+def test_failed_captcha_resubmits_refreshed_state(client, mock):
+    request_open = url("RequestOpen.aspx?rqst=1")
+    mock.get(
+        request_open,
+        text=page(
+            REQUEST_FORM.format(captcha_hash="hash1"), viewstate="form", user="someone"
+        ),
+    )
+    mock.get(f"{DOMAIN}/captcha.jpg", content=b"jpeg")
+    mock.post(
+        request_open,
+        [
+            {
+                "text": page(
+                    REQUEST_FORM.format(captcha_hash="hash2") + CAPTCHA_ERROR,
+                    viewstate="retry",
+                    user="someone",
+                )
+            },
+            {
+                "text": page(
+                    '<span id="ConfirmFormLayout_roReferenceNo">R000123</span>',
+                    user="someone",
+                )
+            },
+        ],
+    )
+
+    form = client.request_form()
+
+    with pytest.raises(IncorrectCaptcha):
+        form.submit({"description": "Records", "captcha": "ABCD"})
+
+    assert form.submit({"description": "Records", "captcha": "EFGH"}) == "R000123"
+
+    first, second = [
+        posted(request) for request in mock.request_history if request.method == "POST"
+    ]
+    assert first["__VIEWSTATE"] == "form"
+    assert second["__VIEWSTATE"] == "retry"
+    assert (
+        second["BDC_VCID_c_requestopen_captchaformlayout_reqstopencaptcha"] == "hash2"
+    )
+    assert second["captchaFormLayout$reqstOpenCaptchaTextBox"] == "EFGH"
@@ -0,0 +1,106 @@
+import json
+import time
+
+import pytest
+import requests
+import requests_mock
+
+from govqa import probe as probe_module
+from govqa.probe import ProbeStore, probe_many
+
+
+def result(domain, status, checked_at=None):
+    return {
+        "domain": domain,
+        "status": status,
+        "url": None,
+        "request_types": [],
+        "error": None,
+        "checked_at": time.time() if checked_at is None else checked_at,
+    }
+
+
+def test_error_results_are_not_reused_by_default():
+    store = ProbeStore()
+    store.add(result("https://down.govqa.us", "error"))
+    store.add(result("https://up.govqa.us", "supported", checked_at=0))
+
+    assert store.get("https://down.govqa.us") is None
+    assert store.get("https://up.govqa.us")["status"] == "supported"
+
+
+def test_error_results_have_their_own_max_age():
+    store = ProbeStore(max_age=3600, error_max_age=60)
+    store.add(result("https://down.govqa.us", "error"))
+    store.add(result("https://stale.govqa.us", "error", time.time() - 120))
+
+    assert store.get("https://down.govqa.us")["status"] == "error"
+    assert store.get("https://stale.govqa.us") is None
+
+
+def test_interrupted_run_saves_finished_results(tmp_path, monkeypatch):
+    def probe(session, domain, timeout):
+        if domain == "https://b.govqa.us":
+            raise KeyboardInterrupt
+        return result(domain, "supported")
+
+    monkeypatch.setattr(probe_module, "probe", probe)
+
+    path = tmp_path / "probes.json"
+    store = ProbeStore(str(path))
+
+    with pytest.raises(KeyboardInterrupt):
+        probe_many(["a.govqa.us", "b.govqa.us"], max_workers=1, store=store)
+
+    with open(path) as f:
+        assert list(json.load(f)) == ["https://a.govqa.us"]
+
+
+HOME = """
+<a href="RequestOpen.aspx?rqst=4">Public Records</a>
+<a href="RequestOpen.aspx?rqst=2">Police Records</a>
+<a href="requestopen.aspx?rqst=4">Public Records</a>
+"""
+
+
+@pytest.fixture
+def hosts():
+    with requests_mock.Mocker() as m:
+        m.get(
+            "https://up.govqa.us/WEBAPP/_rs/",
+            status_code=302,
+            headers={"Location": "https://up.govqa.us/WEBAPP/_rs/SupportHome.aspx"},
+        )
+        m.get("https://up.govqa.us/WEBAPP/_rs/SupportHome.aspx", text=HOME)
+        m.get("https://other.example.com/WEBAPP/_rs/", text="Not GovQA")
+        m.get(
+            "https://slow.govqa.us/WEBAPP/_rs/",
+            exc=requests.exceptions.ReadTimeout("read timed out"),
+        )
+        yield m
+
+
+def test_probe_many_classifies_domains(hosts):
+    results = probe_many(["up.govqa.us", "https://other.example.com/", "slow.govqa.us"])
+
+    up = results["https://up.govqa.us"]
+    assert up["status"] == "supported"
+    assert up["url"] == "https://up.govqa.us/WEBAPP/_rs/SupportHome.aspx"
+    assert up["request_types"] == [2, 4]
+    assert up["error"] is None
+
+    other = results["https://other.example.com"]
+    assert other["status"] == "unsupported"
+    assert other["request_types"] == []
+
+    # one host timing out doesn't hold up the others
+    slow = results["https://slow.govqa.us"]
+    assert slow["status"] == "error"
+    assert slow["url"] is None
+    assert "read timed out" in slow["error"]
+
+
+def test_probe_many_applies_timeout_per_host(hosts):
+    probe_many(["up.govqa.us", "slow.govqa.us"], timeout=(3, 7))
+
+    assert {request.timeout for request in hosts.request_history} == {(3, 7)}
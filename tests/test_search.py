@@ -0,0 +1,86 @@
+import pytest
+
+from govqa import SearchIndex
+
+
+def message(id, body, sender="Records Officer"):
+    return {"id": id, "sender": sender, "body": body}
+
+
+def attachment(filename):
+    return {
+        "url": f"https://files.example.com/{filename}",
+        "content-disposition": f'attachment; filename="{filename}"',
+    }
+
+
+def request(messages, attachments=()):
+    return {"id": 1, "messages": messages, "attachments": list(attachments)}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.sqlite"))
+    yield index
+    index.close()
+
+
+def test_update_counts_new_and_changed_items(index):
+    first = request(
+        [message("1", "We received your request"), message("2", "Fee estimate")],
+        [attachment("invoice.pdf")],
+    )
+
+    assert index.update(first) == 3
+    assert index.update(first) == 0
+
+    changed = request(
+        [message("1", "We received your request"), message("2", "Fee waived")],
+        [attachment("invoice.pdf")],
+    )
+    assert index.update(changed) == 1
+
+
+def test_changed_message_replaces_old_document(index):
+    index.update(request([message("1", "Fee estimate enclosed")]))
+    index.update(request([message("1", "Fee waived")]))
+
+    assert index.search("estimate") == []
+    assert [result["message_id"] for result in index.search("waived")] == ["1"]
+
+
+def test_removed_items_are_dropped(index):
+    index.update(
+        request(
+            [message("1", "First letter"), message("2", "Second letter")],
+            [attachment("letter.pdf")],
+        )
+    )
+    index.update(request([message("1", "First letter")]))
+
+    assert [result["message_id"] for result in index.search("letter")] == ["1"]
+    assert index.search("pdf") == []
+
+
+def test_search_results(index):
+    index.update(
+        request(
+            [message("1", "The responsive records are attached")],
+            [attachment("responsive_records.pdf")],
+        )
+    )
+
+    results = sorted(
+        index.search("responsive"), key=lambda result: result["message_id"] or ""
+    )
+
+    assert results[0] == {
+        "request_id": "1",
+        "message_id": None,
+        "attachment": "responsive_records.pdf",
+        "snippet": "[responsive]_records.pdf",
+    }
+    assert results[1]["request_id"] == "1"
+    assert results[1]["message_id"] == "1"
+    assert results[1]["attachment"] is None
+    assert "[responsive]" in results[1]["snippet"]
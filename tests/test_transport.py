@@ -0,0 +1,103 @@
+import gzip
+import http.server
+import threading
+
+import pytest
+import requests
+
+from govqa import Transport
+
+pytest.importorskip("httpcore")
+
+
+PAGE = b"<html><body>" + b"message " * 10_000 + b"</body></html>"
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/gzip":
+            body = gzip.compress(PAGE)
+            self.send_response(200)
+            self.send_header("Content-Encoding", "gzip")
+        elif self.path == "/login":
+            body = b"logged in"
+            self.send_response(200)
+            self.send_header("Set-Cookie", "session=secret; Path=/")
+        else:
+            body = (self.headers.get("Cookie") or "").encode()
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_http2_adapter_keeps_cookies_per_session(server):
+    adapter = Transport(http2=True).adapter()
+
+    first, second = requests.Session(), requests.Session()
+    for session in (first, second):
+        session.mount("http://", adapter)
+
+    assert first.get(f"{server}/login").text == "logged in"
+    assert first.cookies.get("session") == "secret"
+
+    assert first.get(f"{server}/echo").text == "session=secret"
+    assert second.get(f"{server}/echo").text == ""
+
+
+def test_http2_adapter_rejects_unsupported_proxies(server):
+    session = requests.Session()
+    session.mount("http://", Transport(http2=True).adapter())
+
+    with pytest.raises(requests.exceptions.InvalidSchema):
+        session.get(f"{server}/echo", proxies={"http": "socks5://127.0.0.1:1080"})
+
+
+def test_http2_adapter_decompresses_bodies(server):
+    session = requests.Session()
+    session.mount("http://", Transport(http2=True).adapter())
+
+    assert session.get(f"{server}/gzip").content == PAGE
+
+
+def test_http2_adapter_streams_bodies(server):
+    session = requests.Session()
+    session.mount("http://", Transport(http2=True, pool_maxsize=1).adapter())
+
+    with session.get(f"{server}/gzip", stream=True) as response:
+        assert not response._content_consumed
+        chunks = list(response.iter_content(chunk_size=1024))
+
+    assert len(chunks) > 1
+    assert b"".join(chunks) == PAGE
+
+    # the connection went back to the pool, even for a body left unread
+    with session.get(f"{server}/gzip", stream=True):
+        pass
+    assert session.get(f"{server}/gzip").content == PAGE
+
+
+@pytest.mark.parametrize("http2", [False, True])
+def test_full_pool_times_out(server, http2):
+    session = requests.Session()
+    Transport(pool_maxsize=1, pool_connections=1, pool_timeout=0.5, http2=http2).mount(
+        session
+    )
+
+    with session.get(f"{server}/gzip", stream=True):
+        with pytest.raises(requests.ConnectionError):
+            session.get(f"{server}/echo")
+
+    assert session.get(f"{server}/echo").ok